@@ -0,0 +1,6 @@
+"""
+Management of the simulations of alternatives sharing their first simulation steps.
+
+The heavy dependencies (dill, NumPy, msgpack, pyarrow and the multiprocessing machinery) are imported inside the
+functions using them, at their first call, so that importing the package and starting a worker process stay fast.
+"""
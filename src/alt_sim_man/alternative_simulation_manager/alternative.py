@@ -3,12 +3,14 @@
 """
 import os
 import json
+import time
 
 from copy import deepcopy
-from typing import List, Tuple, Optional
+from typing import Any, List, Tuple, Optional
 
 from .input_data import InputData
 from .simulation_step import SimulationStep
+from .serialization import find_object_file, load_object, save_object
 from ..utils.utils_folder_manipulation import check_dir_exist, check_file_exist, create_dir
 
 
@@ -18,12 +20,14 @@ class Alternative:
     but might have unique parameters for its simulation steps.
     """
     NAME_PROGRESS_FILE = "progress.json"
+    NAME_STEP_RESULT_FILE = "step_{step_index}_result"  # The extension depends on the serialization backend
     EMPTY_STEP_DICT_PROGRESS_FILE = {
         "step_id": None,
         "input_data_id": None,
         "has_run": False,
         "duration": None,
-        "parent_alternative": None
+        "parent_alternative": None,
+        "error": None
     }
 
     def __init__(self, identifier: str, step_input_data_tuple_list: List[Tuple[SimulationStep, InputData]]):
@@ -134,6 +138,24 @@ class Alternative:
         with open(path_progress_file, "w") as f:
             json.dump(progress_dict, f, indent=4)
 
+    def has_progress_json_file(self, path_simulation_dir: str) -> bool:
+        """
+        Check if the progress file of the alternative exists, meaning the alternative was already initialized.
+        :param path_simulation_dir: str, path to the simulation folder containing all the alternative sub-folders
+        """
+        return os.path.isfile(os.path.join(self._path_alternative_dir(path_simulation_dir), self.NAME_PROGRESS_FILE))
+
+    def read_progress_json_file(self, path_simulation_dir: str) -> dict:
+        """
+        Read the progress file of the alternative.
+        :param path_simulation_dir: str, path to the simulation folder containing all the alternative sub-folders
+        :return: dict, the progress of each step, with the step index (as a string) as key.
+        """
+        path_progress_file = os.path.join(self._path_alternative_dir(path_simulation_dir), self.NAME_PROGRESS_FILE)
+        check_file_exist(path_progress_file)
+        with open(path_progress_file, 'r') as f:
+            return json.load(f)
+
     def update_progress_json_file_after_run_step(self, path_simulation_dir: str, step_index: int, duration: float,
                                                  parent_alternative: Optional[str | None] = None):
         """
@@ -152,22 +174,83 @@ class Alternative:
         # Load the config file as a dictionary
         with open(path_progress_file, 'r') as f:
             progress_dict = json.load(f)
-        progress_dict[step_index]["has_run"] = True
-        progress_dict[step_index]["duration"] = duration
-        progress_dict[step_index]["parent_alternative"] = parent_alternative
+        # Keys are converted to strings by json
+        progress_dict[str(step_index)]["has_run"] = True
+        progress_dict[str(step_index)]["duration"] = duration
+        progress_dict[str(step_index)]["parent_alternative"] = parent_alternative
+        progress_dict[str(step_index)]["error"] = None
         with open(path_progress_file, "w") as f:
             json.dump(progress_dict, f, indent=4)
 
-    def run(self, path_simulation_dir: str, step_index: int) -> dict:
+    def update_progress_json_file_after_fail_step(self, path_simulation_dir: str, step_index: int, error: str,
+                                                  parent_alternative: Optional[str | None] = None):
+        """
+        Record the failure of a step in the progress file. The step is not marked as run, so that it is run again
+        if the simulation is resumed.
+        :param path_simulation_dir: str, path to the simulation folder containing all the alternative sub-folders
+        :param step_index: int,
+        :param error: str, description of the error
+        :param parent_alternative: str or None,
         """
-        Run the simulation for this alternative.
+        if step_index >= self.num_step:
+            raise IndexError(f"Try to update progress file step number {step_index} for Alternative "
+                             f"'{self.identifier}' while it has only {self.num_step}")
+        path_progress_file = os.path.join(self._path_alternative_dir(path_simulation_dir), self.NAME_PROGRESS_FILE)
+        check_file_exist(path_progress_file)
+        with open(path_progress_file, 'r') as f:
+            progress_dict = json.load(f)
+        progress_dict[str(step_index)]["has_run"] = False
+        progress_dict[str(step_index)]["parent_alternative"] = parent_alternative
+        progress_dict[str(step_index)]["error"] = error
+        with open(path_progress_file, "w") as f:
+            json.dump(progress_dict, f, indent=4)
+
+    def save_step_result(self, path_simulation_dir: str, step_index: int, result: Any):
+        """
+        Save the result of a step in the alternative folder, so that the simulation can be resumed.
+        The serialization backend is selected from the type of the result.
+        :param path_simulation_dir: str, path to the simulation folder containing all the alternative sub-folders
+        :param step_index: int, index of the step
+        :param result: the result of the step
+        :return: str, path of the result file
+        """
+        return save_object(result, os.path.join(self._path_alternative_dir(path_simulation_dir),
+                                                self.NAME_STEP_RESULT_FILE.format(step_index=step_index)))
 
-        :return: A dictionary containing the results of each step.
+    def find_step_result_file(self, path_simulation_dir: str, step_index: int) -> str:
+        """
+        Find the file of the result of a step saved in the alternative folder, whatever its serialization backend.
+        :param path_simulation_dir: str, path to the simulation folder containing all the alternative sub-folders
+        :param step_index: int, index of the step
+        :return: str, path of the result file
         """
-        # results = {}
-        # for step in self.steps:
-        #     # Use the shared input data for common parameters,
-        #     # and possibly specific parameters for this alternative if any.
-        #     step_inputs = self.input_data.__dict__  # Convert the input data into a dict
-        #     results[step.name] = step.run(step_inputs)
-        # return results
+        path_result_file = os.path.join(self._path_alternative_dir(path_simulation_dir),
+                                        self.NAME_STEP_RESULT_FILE.format(step_index=step_index))
+        path_result_file_with_extension = find_object_file(path_result_file)
+        if path_result_file_with_extension is None:
+            raise FileNotFoundError(f"File not found: {path_result_file}")
+        return path_result_file_with_extension
+
+    def load_step_result(self, path_simulation_dir: str, step_index: int) -> Any:
+        """
+        Load the result of a step saved in the alternative folder. NumPy arrays are loaded memory mapped.
+        :param path_simulation_dir: str, path to the simulation folder containing all the alternative sub-folders
+        :param step_index: int, index of the step
+        :return: the result of the step
+        """
+        return load_object(self.find_step_result_file(path_simulation_dir, step_index))
+
+    def run(self, step_index: int, inputs: Optional[List] = None) -> Tuple[Any, float]:
+        """
+        Run a simulation step of this alternative.
+
+        :param step_index: int, index of the step to run
+        :param inputs: list, the results of the steps the step depends on
+        :return: The result of the step and its duration in seconds.
+        """
+        if step_index >= self.num_step:
+            raise IndexError(f"Try to run step number {step_index} of Alternative '{self.identifier}' while it has "
+                             f"only {self.num_step}")
+        start_time = time.perf_counter()
+        result = self._step_list[step_index].run(self._input_data_list[step_index], inputs)
+        return result, time.perf_counter() - start_time
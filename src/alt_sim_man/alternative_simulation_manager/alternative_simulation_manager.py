@@ -1,14 +1,18 @@
 """
 Class to manage alternatives for simulations with multiple common simulation steps.
 """
-import dill
 import os
 import logging
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from .simulation_step import SimulationStep
 from .alternative import Alternative
 from .input_data import InputData
+from .results_store import ResultStore
+from .simulation_executor import SimulationExecutor
+from .simulation_tree import compute_tree_report
+from .step_statistics import StepStatistics
+from .worker_pool import WorkerPool
 
 
 class AlternativeSimulationManager:
@@ -21,7 +25,8 @@ class AlternativeSimulationManager:
 
     def __init__(self):
         self._alternative_dict: Dict[str, Alternative] = {}
-
+        self._path_simulation_folder: Optional[str] = None
+        self._simulation_executor: Optional[SimulationExecutor] = None
 
     @property
     def num_alternatives(self):
@@ -35,53 +40,63 @@ class AlternativeSimulationManager:
     def _alternative_list(self):
         return list(self._alternative_dict.values())
 
-    def group_alternatives_to_tree(self,alternative_id_list):
+    def iter_alternative_ids(self) -> Iterator[str]:
+        """
+        Iterate over the identifiers of the alternatives, without building a list.
+        """
+        return iter(self._alternative_dict)
+
+    def iter_alternatives(self) -> Iterator[Alternative]:
+        """
+        Iterate over the alternatives, without building a list.
+        """
+        return iter(self._alternative_dict.values())
+
+    def group_alternatives_to_tree(self, alternative_id_list: Iterable[str]):
         """
         Groups alternatives based on shared simulation steps and input data.
         Each alternative's steps are considered individually, and the tree is built.
-        :param alternatives: List of alternatives to group.
+        :param alternative_id_list: Identifiers of the alternatives to group.
         """
-        return self._group_alternatives_recursive([self._alternative_dict[id] for id in alternative_id_list],step_index=0)
+        return self._group_alternatives_recursive([self._alternative_dict[id] for id in alternative_id_list],
+                                                  step_index=0)
 
     def _group_alternatives_recursive(self, alternative_list: List[Alternative], step_index: int = 0) -> list:
         """
         Recursively groups alternatives based on the simulation steps they have and their associated input data.
         If alternatives share the same step and input data, they are grouped together.
-        :param alternatives: List of alternatives to group.
+        The candidate groups of an alternative are found from the fingerprint of its input data, so that it is
+        compared only to the groups it most likely belongs to.
+        The groups are built in place: each group is the list of its alternatives, followed by the list of its
+        sub-groups for the next step.
+        :param alternative_list: List of alternatives to group.
         :param step_index: The index of the current step in the simulation process.
         :return: A list of groups, each group contains alternatives sharing the same step and input data.
         """
         if not alternative_list:
             return []
 
-        # # If we have exhausted all steps, return individual alternatives as leaf nodes.
-        # if step_index >= max(len(alt.steps) for alt in alternatives):
-        #     return [[alt] for alt in alternatives]
-
         # Group alternatives by the current step and input data
         group_list = []
+        group_list_dict: Dict[tuple, List[list]] = {}  # Groups by step and input data fingerprint
         for alt in alternative_list:
             if step_index < alt.num_step:
-                added_flag = False
-                for group in group_list:
-                    if Alternative.has_same_simulation_step(alt,group[0],step_index,check_inputdata=True):
+                step = alt.step_list[step_index]
+                key = (step.name, step.function.__name__, alt.input_data_list[step_index].fingerprint)
+                candidate_group_list = group_list_dict.setdefault(key, [])
+                for group in candidate_group_list:
+                    if Alternative.has_same_simulation_step(alt, group[0], step_index, check_inputdata=True):
                         group.append(alt)
-                        added_flag =True
                         break
-                if not added_flag:
-                    group_list.append([alt])
-
+                else:
+                    candidate_group_list.append([alt])
+                    group_list.append(candidate_group_list[-1])
 
-        # Process to the next step for each group
-        tree = []
+        # Process to the next step for each group, the sub-groups are added at the end of the group
         for group in group_list:
-            # Recursively group the alternatives based on the next step
-            sub_groups = self._group_alternatives_recursive(list(group), step_index + 1)
-            group_with_next_steps = list(group)
-            group_with_next_steps.append(list(sub_groups) if sub_groups !=[] else [])
-            tree.append(group_with_next_steps)  # Add step info along with subgroups
+            group.append(self._group_alternatives_recursive(group, step_index + 1))
 
-        return list(tree)
+        return group_list
 
     def add_alternatives(self, alternative_list: List[Alternative]) -> None:
         """
@@ -93,34 +108,50 @@ class AlternativeSimulationManager:
         for alternative in alternative_list:
             if not isinstance(alternative,Alternative):
                 raise TypeError(f"the object {alternative} is not an Alternative object")
-            if alternative.identifier in list[self._alternative_dict.keys()]:
-                logging.WARNING(f"The alternative {alternative.identifier} is already in the "
-                                 f"AlternativeSurfaceManager, it will not be added a second time")
-                return
+            if alternative.identifier in self._alternative_dict:
+                logging.warning(f"The alternative {alternative.identifier} is already in the "
+                                f"AlternativeSimulationManager, it will not be added a second time")
+                continue
             self._alternative_dict[alternative.identifier] = alternative
 
-    def set_up(self, path_simulation_folder:str, alternative_id_list: Optional[List[str]] = []) -> Dict[str, any]:
+    def set_up(self, path_simulation_folder:str, alternative_id_list: Optional[List[str]] = [],
+               num_workers: int = 1, step_statistics: Optional[StepStatistics] = None) -> Dict[str, any]:
         """
-        Run a simulation based on the selected alternative.
-
-        :param alt_name: The name of the alternative workflow to run.
-        :return: A dictionary with step names as keys and their corresponding results as values.
+        Set up the simulation of the selected alternatives, and report its predicted cost without running anything.
+
+        :param path_simulation_folder: str, path to the simulation folder containing all the alternative sub-folders
+        :param alternative_id_list: The identifiers of the alternatives to simulate, all of them if empty.
+        :param num_workers: int, number of workers the simulation is planned to run on, for the predicted wall time.
+        :param step_statistics: StepStatistics, the durations and result sizes of previous runs of the steps. By
+            default, the statistics saved in the simulation folder by the previous runs are used.
+        :return: A dictionary reporting the number of nodes of the tree per level, the number of step executions
+            saved by sharing the common steps, and the predicted wall time (seconds) and disk footprint (bytes).
         """
         # Set the alternatives to run
         if  alternative_id_list:
-            alternative_id_list = set(alternative_id_list) # remove duplicate
+            # remove duplicate, keeping the order so that the tree is the same if the simulation is resumed
+            alternative_id_list = list(dict.fromkeys(alternative_id_list))
 
             invalid_id = []
             for alternative_id in alternative_id_list:
                 if alternative_id not in self._alternative_dict:
                     invalid_id.append(alternative_id)
             if invalid_id:
-                raise KeyError(f"The alternatives with ids:'{"', '".join(invalid_id)}' are not part of the "
+                invalid_id_str = "', '".join(invalid_id)
+                raise KeyError(f"The alternatives with ids:'{invalid_id_str}' are not part of the "
                                f"AlternativeSimulationManager. Please input only valid alternatives")
         else:
-            alternative_id_list = self.alternative_id_list
+            alternative_id_list = list(self.iter_alternative_ids())
         # Group alternatives at each simulation steps
-        self.group_alternatives_to_tree(alternative_id_list=alternative_id_list)
+        simulation_tree = self.group_alternatives_to_tree(alternative_id_list=alternative_id_list)
+        self._path_simulation_folder = path_simulation_folder
+        self._simulation_executor = SimulationExecutor(
+            alternative_list=[self._alternative_dict[alternative_id] for alternative_id in alternative_id_list],
+            simulation_tree=simulation_tree)
+
+        if step_statistics is None and os.path.isdir(path_simulation_folder):
+            step_statistics = StepStatistics.load(path_simulation_folder)
+        return compute_tree_report(simulation_tree, num_workers=num_workers, step_statistics=step_statistics)
 
         # if alt_name not in self.alternatives:
         #     raise ValueError(f"❌ Alternative '{alt_name}' not found")
@@ -135,6 +166,31 @@ class AlternativeSimulationManager:
         #     results[step_name] = step.run(inputs)
         # return results
 
+    def run(self, overwrite: bool = False, run_in_parallel: Optional[bool] = False, num_workers: Optional[int] = None,
+            result_store: Optional[ResultStore] = None, worker_pool: Optional[WorkerPool] = None,
+            batch_duration: float = 0.05, memory_budget: Optional[int] = None) -> None:
+        """
+        Run the simulation of the alternatives selected with set_up.
+
+        :param overwrite: bool, True if the alternative simulation folders should be overwritten, otherwise the
+            simulation is resumed from where it stopped.
+        :param run_in_parallel: bool, True to run the independent steps in parallel worker processes.
+        :param num_workers: int, number of worker processes, the number of CPUs if None.
+        :param result_store: ResultStore, store collecting the result of each alternative once it is completed.
+        :param worker_pool: WorkerPool, the pool running the steps in parallel, the pool shared by all the runs of
+            the process if None.
+        :param batch_duration: float, targeted duration in seconds of the batches in which the cheap sibling leaf
+            steps are run together, 0 to run each step separately.
+        :param memory_budget: int, maximum memory in bytes held by the intermediate results kept in memory, the
+            results over the budget are spilled and loaded again from the disk when needed. None for no limit.
+        """
+        if self._simulation_executor is None:
+            raise RuntimeError("The simulation is not set up, call set_up before running it")
+        self._simulation_executor.run(self._path_simulation_folder, overwrite=overwrite,
+                                      run_in_parallel=run_in_parallel, num_workers=num_workers,
+                                      result_store=result_store, worker_pool=worker_pool,
+                                      batch_duration=batch_duration, memory_budget=memory_budget)
+
     @staticmethod
     def save(obj: 'AlternativeSimulationManager', filename: str) -> None:
         """
@@ -144,6 +200,7 @@ class AlternativeSimulationManager:
         :param filename: The file path where the AlternativeSimulationManager should be saved.
         :return: None
         """
+        import dill
         try:
             with open(filename, "wb") as f:
                 dill.dump(obj, f)
@@ -164,6 +221,7 @@ class AlternativeSimulationManager:
         if not os.path.isfile(filename):
             raise FileNotFoundError(f"❌ File not found: {filename}")
 
+        import dill
         try:
             with open(filename, "rb") as f:
                 obj = dill.load(f)
@@ -1,23 +1,123 @@
 """
 
 """
+import hashlib
+import json
+import os
+from collections import ChainMap
+from typing import Dict, Optional
+
+from .serialization import find_object_file, is_numpy_array, is_plain_data, load_object, save_object
+from ..utils import create_dir
+
+_MISSING = object()
+
+
+def _canonical_encoding(value) -> Optional[str]:
+    """
+    Encode a value so that equal values have the same encoding: booleans and integral floats are encoded as integers,
+    and dictionaries regardless of the order of their keys.
+
+    :param value: the value to encode.
+    :return: str, the encoding, or None if the value has no canonical encoding.
+    """
+    value_type = type(value)
+    if value is None:
+        return "n"
+    if value_type is str:
+        return json.dumps(value)
+    if value_type in (bool, int):
+        return f"i{int(value)}"
+    if value_type is float:
+        return f"i{int(value)}" if value.is_integer() else f"f{value!r}"
+    if value_type in (list, tuple):
+        item_encoding_list = [_canonical_encoding(item) for item in value]
+        if None in item_encoding_list:
+            return None
+        return f"{'l' if value_type is list else 't'}[{','.join(item_encoding_list)}]"
+    if value_type is dict:
+        item_encoding_list = []
+        for key, item in value.items():
+            key_encoding, item_encoding = _canonical_encoding(key), _canonical_encoding(item)
+            if key_encoding is None or item_encoding is None:
+                return None
+            item_encoding_list.append(f"{key_encoding}:{item_encoding}")
+        return f"d{{{','.join(sorted(item_encoding_list))}}}"
+    if value_type.__module__ == "numpy" and not is_numpy_array(value) and hasattr(value, "item"):
+        return _canonical_encoding(value.item())
+    return None
+
+
+def _hash_param(param_name: str, value) -> int:
+    """
+    Hash a parameter from its name and the content of its value, so that equal values have the same hash: plain data
+    is hashed from its canonical encoding and NumPy arrays from their data. The other values all have the same hash,
+    InputData differing only by them are told apart by comparing them.
+    """
+    encoding = _canonical_encoding(value)
+    if encoding is not None:
+        value_bytes = b"c" + encoding.encode()
+    elif is_numpy_array(value):
+        import numpy
+        value_bytes = f"a{value.dtype.str}{value.shape}".encode() + numpy.ascontiguousarray(value).tobytes()
+    else:
+        value_bytes = b"?"
+    return int(hashlib.sha1(param_name.encode() + b"\0" + value_bytes).hexdigest(), 16)
+
+
+def _param_values_equal(value_1, value_2) -> bool:
+    """
+    Compare two parameter values: the same object is equal to itself, NumPy arrays are equal if they have the same
+    type of data, shape and elements, and the other values are compared with ==.
+    """
+    if value_1 is value_2:
+        return True
+    if _is_array(value_1) or _is_array(value_2):
+        import numpy
+        return _is_array(value_1) and _is_array(value_2) and value_1.dtype == value_2.dtype and \
+            bool(numpy.array_equal(value_1, value_2))
+    return value_1 == value_2
+
+
+def _is_array(value) -> bool:
+    value_type = type(value)
+    return value_type.__module__ == "numpy" and value_type.__name__ in ("ndarray", "memmap")
+
 
 class InputData:
     """
     This class represents the input data for a specific simulation step.
     It holds parameters that are specific to the step, and can be preprocessed before assignment.
+
+    An InputData can be defined as a base InputData and the few parameters overriding it, for the sweeps varying
+    only some parameters of a base case. The base is shared, not copied, and the comparison and the fingerprint of
+    such InputData only involve the overriding parameters.
+    The parameters should not be modified once the InputData is used by other InputData or fingerprinted.
     """
-    def __init__(self, identifier: str, step_name: str, params: dict):
+    NAME_METADATA_FILE = "input_data"  # The extension depends on the serialization backend
+    NAME_BASE_DIR = "base_{identifier}"  # Folder of a shared base, next to the InputData folders using it
+    HASH_MODULUS = 1 << 160
+
+    def __init__(self, identifier: str, step_name: str, params: dict, base: Optional['InputData'] = None):
         """
         Initialize the InputData with a unique identifier, the name of the associated step, and parameters.
 
         :param identifier: Unique identifier for the InputData instance.
         :param step_name: The name of the simulation step to which this InputData is tied.
-        :param params: Parameters specific to the simulation step.
+        :param params: Parameters specific to the simulation step, the parameters overriding the ones of the base if
+            a base is given.
+        :param base: InputData of the same step providing the parameters that are not overridden (optional).
         """
+        if base is not None and base.step_name != step_name:
+            raise ValueError(f"The base InputData '{base.identifier}' is for step '{base.step_name}', expected "
+                             f"step '{step_name}'")
         self._identifier = identifier
         self._step_name = step_name
-        self._params = params
+        self._base = base
+        self._overrides = params
+        self._params = params if base is None else ChainMap(params, base.params)
+        self._param_hash_dict: Dict[str, int] = {}  # Hashes of the overriding parameters, computed when needed
+        self._params_hash: Optional[int] = None
 
     @property
     def identifier(self):
@@ -31,6 +131,53 @@ class InputData:
     def params(self):
         return self._params
 
+    @property
+    def base(self) -> Optional['InputData']:
+        return self._base
+
+    @property
+    def overrides(self) -> dict:
+        """
+        The parameters overriding the base, all the parameters if there is no base.
+        """
+        return self._overrides
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Fingerprint of the identifier, step name and parameters of the InputData. The hash of the parameters is the
+        sum of the hashes of each parameter, so that it is computed from the one of the base and the overriding
+        parameters only. Equal InputData have the same fingerprint, but InputData with the same fingerprint may differ,
+        by values without canonical encoding or by a hash collision, and must still be compared.
+        """
+        return f"{self._identifier}:{self._step_name}:{self._get_params_hash():040x}"
+
+    def _get_param_hash(self, param_name: str) -> Optional[int]:
+        """
+        Hash of a parameter, None if the InputData does not have it.
+        """
+        if param_name in self._overrides:
+            if param_name not in self._param_hash_dict:
+                self._param_hash_dict[param_name] = _hash_param(param_name, self._overrides[param_name])
+            return self._param_hash_dict[param_name]
+        if self._base is not None:
+            return self._base._get_param_hash(param_name)
+        return None
+
+    def _get_params_hash(self) -> int:
+        """
+        Hash of all the parameters, from the hash of the base and the ones of the overriding parameters.
+        """
+        if self._params_hash is None:
+            params_hash = 0 if self._base is None else self._base._get_params_hash()
+            for param_name in self._overrides:
+                base_param_hash = None if self._base is None else self._base._get_param_hash(param_name)
+                if base_param_hash is not None:
+                    params_hash -= base_param_hash
+                params_hash += self._get_param_hash(param_name)
+            self._params_hash = params_hash % self.HASH_MODULUS
+        return self._params_hash
+
     def preprocess(self) -> None:
         """
         Preprocess the input data if needed (e.g., validate, modify, or compute derived values).
@@ -41,13 +188,83 @@ class InputData:
         pass
 
 
+    @staticmethod
+    def save(obj: 'InputData', path_dir: str, path_base_dir: Optional[str] = None) -> None:
+        """
+        Save an InputData object to a folder. The plain parameters are saved with the identifier and step name in
+        a metadata file (msgpack or json), the NumPy array parameters in '.npy' files and the other parameters
+        with dill.
+        Only the overriding parameters of an InputData with a base are saved in its folder, the base is saved once in
+        its own folder, shared by all the InputData using it.
+
+        :param obj: The InputData object to be saved.
+        :param path_dir: The path of the folder where the InputData should be saved.
+        :param path_base_dir: The path of the folder of the base, if the InputData has one. By default, the folder
+            'base_<base identifier>' next to the InputData folder. The base is not saved again if it is already there.
+        :return: None
+        """
+        create_dir(path_dir)
+        base_dir = None
+        if obj.base is not None:
+            if path_base_dir is None:
+                path_base_dir = os.path.join(os.path.dirname(os.path.abspath(path_dir)),
+                                             InputData.NAME_BASE_DIR.format(identifier=obj.base.identifier))
+            if find_object_file(os.path.join(path_base_dir, InputData.NAME_METADATA_FILE)) is None:
+                InputData.save(obj.base, path_base_dir)
+            base_dir = os.path.relpath(path_base_dir, os.path.abspath(path_dir))
+        plain_param_dict = {}
+        param_file_dict = {}
+        for param_name, value in obj.overrides.items():
+            if is_plain_data(value):
+                plain_param_dict[param_name] = value
+            else:
+                path_param_file = save_object(value, os.path.join(path_dir, f"param_{param_name}"))
+                param_file_dict[param_name] = os.path.basename(path_param_file)
+        save_object({"identifier": obj.identifier, "step_name": obj.step_name, "params": plain_param_dict,
+                     "param_files": param_file_dict, "base_dir": base_dir},
+                    os.path.join(path_dir, InputData.NAME_METADATA_FILE))
+        print(f"✅ InputData saved to {path_dir}")
+
+    @staticmethod
+    def load(path_dir: str, mmap: bool = True, base_dict: Optional[Dict[str, 'InputData']] = None) -> 'InputData':
+        """
+        Load an InputData object saved in a folder.
+
+        :param path_dir: The path of the folder from which to load the InputData.
+        :param mmap: True to load the NumPy array parameters memory mapped (read-only), without copying them.
+        :param base_dict: dict of the bases already loaded, by folder path. The bases loaded are added to it, pass the
+            same dictionary to the loads of InputData sharing a base so that it is loaded once.
+        :return: The loaded InputData object.
+        :raises FileNotFoundError: If the folder does not contain an InputData.
+        """
+        path_metadata_file = find_object_file(os.path.join(path_dir, InputData.NAME_METADATA_FILE))
+        if path_metadata_file is None:
+            raise FileNotFoundError(f"❌ InputData not found in: {path_dir}")
+        metadata = load_object(path_metadata_file)
+        params = metadata["params"]
+        for param_name, param_file in metadata["param_files"].items():
+            params[param_name] = load_object(os.path.join(path_dir, param_file), mmap=mmap)
+        base = None
+        if metadata.get("base_dir") is not None:
+            base_dict = {} if base_dict is None else base_dict
+            path_base_dir = os.path.normpath(os.path.join(os.path.abspath(path_dir), metadata["base_dir"]))
+            if path_base_dir not in base_dict:
+                base_dict[path_base_dir] = InputData.load(path_base_dir, mmap=mmap, base_dict=base_dict)
+            base = base_dict[path_base_dir]
+        print(f"✅ InputData loaded from {path_dir}")
+        return InputData(metadata["identifier"], metadata["step_name"], params, base=base)
+
     def __repr__(self) -> str:
+        if self._base is not None:
+            return f"InputData(identifier={self.identifier}, step_name={self.step_name}, " \
+                   f"base={self._base.identifier}, overrides={self._overrides})"
         return f"InputData(identifier={self.identifier}, step_name={self.step_name}, params={self.params})"
 
     def __eq__(self, other: object) -> bool:
         """
         Compare two InputData objects for equality. They are considered equal if they have the same identifier,
-        step name, and parameters.
+        step name, and parameters. Only the overriding parameters are compared if they share the same base.
+        NumPy arrays are compared by content.
 
         :param other: The other object to compare against.
         :return: True if the objects are considered equal, False otherwise.
@@ -55,9 +272,20 @@ class InputData:
         if not isinstance(other, InputData):
             return False  # Ensure we are comparing InputData objects
 
+        if self._base is not None and self._base is other.base:
+            # The parameters that are not overridden by any of them are the ones of the base
+            return (
+                    self._identifier == other.identifier and
+                    self._step_name == other.step_name and
+                    all(_param_values_equal(self._params.get(param_name, _MISSING),
+                                            other.params.get(param_name, _MISSING))
+                        for param_name in self._overrides.keys() | other.overrides.keys())
+            )
+
         # Compare identifier, step_name, and params (dictionary)
         return (
                 self._identifier == other.identifier and
                 self._step_name == other.step_name and
-                self._params == other.params
+                self._params.keys() == other.params.keys() and
+                all(_param_values_equal(value, other.params[param_name]) for param_name, value in self._params.items())
         )
\ No newline at end of file
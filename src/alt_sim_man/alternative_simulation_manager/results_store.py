@@ -0,0 +1,275 @@
+"""
+Columnar store collecting the results of the alternatives as they complete.
+"""
+import os
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .alternative import Alternative
+from ..utils import create_dir
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow only when the store actually reads or writes data, as it is an optional dependency.
+    """
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("❌ The ResultStore requires pyarrow, install it with 'pip install alt_sim_man[results]'") \
+            from e
+    return pyarrow
+
+
+class ResultStore:
+    """
+    Stream the results of completed alternatives into a local columnar store (Parquet or Arrow IPC).
+    Each row corresponds to one alternative, keyed by its identifier and by the parameter values of each of its
+    steps, so that the results of many alternatives can be queried and aggregated without loading every alternative
+    folder.
+
+    Rows are buffered in memory and written as a new part file every time the buffer is full. The part files of
+    an interrupted simulation are kept, new parts are appended to them.
+    The values of a column with different types, e.g. a result that is an integer for some alternatives and a string
+    for others, are stored as bytes serialized with dill, like the values that are not scalars.
+    """
+    ALTERNATIVE_ID_COLUMN = "alternative_id"
+    RESULT_COLUMN = "result"
+    FILE_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+    def __init__(self, path_store_dir: str, batch_size: int = 1000, file_format: str = "parquet"):
+        """
+        :param path_store_dir: str, path to the directory containing the part files of the store.
+        :param batch_size: int, number of rows buffered before being written to a new part file.
+        :param file_format: str, format of the part files, either 'parquet' or 'arrow' (Arrow IPC).
+        """
+        if file_format not in self.FILE_FORMATS:
+            raise ValueError(f"Invalid file format '{file_format}', expected one of: "
+                             f"{', '.join(self.FILE_FORMATS)}")
+        if batch_size < 1:
+            raise ValueError(f"The batch size should be at least 1, got {batch_size}")
+        self._path_store_dir = path_store_dir
+        self._batch_size = batch_size
+        self._file_format = file_format
+        self._row_buffer: List[Dict[str, Any]] = []
+
+    @property
+    def path_store_dir(self):
+        return self._path_store_dir
+
+    @property
+    def file_format(self):
+        return self._file_format
+
+    @property
+    def num_buffered_rows(self):
+        return len(self._row_buffer)
+
+    @property
+    def part_file_list(self) -> List[str]:
+        if not os.path.isdir(self._path_store_dir):
+            return []
+        extension = self.FILE_FORMATS[self._file_format]
+        return [os.path.join(self._path_store_dir, file_name) for file_name in sorted(os.listdir(self._path_store_dir))
+                if file_name.endswith(extension)]
+
+    def add_result(self, alternative: Alternative, result: Any) -> None:
+        """
+        Add the result of a completed alternative to the store.
+        The row is written to disk once the buffer reaches the batch size.
+
+        :param alternative: Alternative, the completed alternative.
+        :param result: the result of the last step of the alternative.
+        """
+        self._row_buffer.append(self.make_row(alternative, result))
+        if len(self._row_buffer) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered rows to a new part file.
+        """
+        if not self._row_buffer:
+            return
+        pa = _import_pyarrow()
+        # The alternatives do not necessarily have the same steps, gather all the columns
+        column_dict: Dict[str, None] = {}
+        for row in self._row_buffer:
+            column_dict.update(dict.fromkeys(row))
+        array_dict = {}
+        for column in column_dict:
+            value_list = [row.get(column) for row in self._row_buffer]
+            try:
+                array_dict[column] = pa.array(value_list)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                array_dict[column] = self._to_bytes_array(value_list)
+        table = pa.table(array_dict)
+
+        create_dir(self._path_store_dir)
+        path_part_file = os.path.join(self._path_store_dir, f"part_{len(self.part_file_list):05d}"
+                                                            f"{self.FILE_FORMATS[self._file_format]}")
+        path_tmp_file = path_part_file + ".tmp"
+        if self._file_format == "parquet":
+            pa.parquet.write_table(table, path_tmp_file)
+        else:
+            with pa.ipc.new_file(path_tmp_file, table.schema) as writer:
+                writer.write_table(table)
+        # Only complete part files are visible to the readers
+        os.replace(path_tmp_file, path_part_file)
+        self._row_buffer = []
+
+    def read_alternative_ids(self) -> Set[str]:
+        """
+        Read the identifiers of the alternatives in the store, written or buffered, so that a resumed simulation only
+        collects the missing ones.
+        """
+        alternative_id_set = {row[self.ALTERNATIVE_ID_COLUMN] for row in self._row_buffer}
+        if self.part_file_list:
+            alternative_id_set.update(self.read(columns=[self.ALTERNATIVE_ID_COLUMN])[self.ALTERNATIVE_ID_COLUMN]
+                                      .to_pylist())
+        return alternative_id_set
+
+    def clear(self) -> None:
+        """
+        Remove the part files and the buffered rows of the store, to collect the results of a simulation run again
+        from scratch.
+        """
+        self._row_buffer = []
+        for path_part_file in self.part_file_list:
+            os.remove(path_part_file)
+
+    def close(self) -> None:
+        """
+        Write the remaining buffered rows.
+        """
+        self.flush()
+
+    def _dataset(self):
+        """
+        Open the part files as a single dataset, with a schema unifying the ones of all the parts.
+        """
+        pa = _import_pyarrow()
+        part_file_list = self.part_file_list
+        if not part_file_list:
+            raise FileNotFoundError(f"❌ No result found in the store: {self._path_store_dir}")
+        if self._file_format == "parquet":
+            schema_list = [pa.parquet.read_schema(path) for path in part_file_list]
+            dataset_format = "parquet"
+        else:
+            schema_list = [pa.ipc.open_file(path).schema for path in part_file_list]
+            dataset_format = "ipc"
+        try:
+            schema = pa.unify_schemas(schema_list, promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return self._conflicting_parts_dataset(part_file_list, schema_list)
+        return pa.dataset.dataset(part_file_list, schema=schema, format=dataset_format)
+
+    def _conflicting_parts_dataset(self, part_file_list: List[str], schema_list: list):
+        """
+        Open part files whose columns have types that can not be unified, e.g. a result that was an integer in a part
+        and a string in another. The parts are loaded in memory and the conflicting columns are converted to bytes.
+        """
+        pa = _import_pyarrow()
+        type_list_dict: Dict[str, list] = {}
+        for schema in schema_list:
+            for field in schema:
+                type_list_dict.setdefault(field.name, []).append(field)
+        conflicting_column_list = []
+        for column, field_list in type_list_dict.items():
+            try:
+                pa.unify_schemas([pa.schema([field]) for field in field_list], promote_options="permissive")
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                conflicting_column_list.append(column)
+        table_list = []
+        for path_part_file in part_file_list:
+            if self._file_format == "parquet":
+                table = pa.parquet.read_table(path_part_file)
+            else:
+                table = pa.ipc.open_file(path_part_file).read_all()
+            for column in conflicting_column_list:
+                if column in table.column_names:
+                    table = table.set_column(table.column_names.index(column), column,
+                                             self._to_bytes_array(table[column].to_pylist()))
+            table_list.append(table)
+        return pa.dataset.dataset(pa.concat_tables(table_list, promote_options="permissive"))
+
+    def read(self, columns: Optional[List[str]] = None, filter=None):
+        """
+        Read the results of the store, only the requested columns and rows are loaded.
+
+        :param columns: list of the names of the columns to read, all of them if None.
+        :param filter: pyarrow.dataset.Expression to select the rows, e.g. pyarrow.dataset.field("Step 1.param1") > 2
+        :return: pyarrow.Table
+        """
+        return self._dataset().to_table(columns=columns, filter=filter)
+
+    def iter_batches(self, columns: Optional[List[str]] = None, filter=None, batch_size: int = 65536) -> Iterator:
+        """
+        Iterate over the results of the store by record batches, to aggregate them with a bounded memory.
+
+        :param columns: list of the names of the columns to read, all of them if None.
+        :param filter: pyarrow.dataset.Expression to select the rows.
+        :param batch_size: int, maximum number of rows per batch.
+        :return: iterator of pyarrow.RecordBatch
+        """
+        return self._dataset().to_batches(columns=columns, filter=filter, batch_size=batch_size)
+
+    def count_rows(self, filter=None) -> int:
+        """
+        Count the results in the store without loading them.
+        """
+        return self._dataset().count_rows(filter=filter)
+
+    @classmethod
+    def make_row(cls, alternative: Alternative, result: Any) -> Dict[str, Any]:
+        """
+        Make the row of an alternative.
+        The parameter columns are named '<step prefix>.<parameter name>', with a '_<occurrence>' suffix added to the
+        prefix if the step is present several times in the alternative. A dictionary result is split in
+        'result.<key>' columns.
+
+        :param alternative: Alternative, the completed alternative.
+        :param result: the result of the last step of the alternative.
+        :return: dict, the row.
+        """
+        row = {cls.ALTERNATIVE_ID_COLUMN: alternative.identifier}
+        prefix_count: Dict[str, int] = {}
+        for step, input_data in zip(alternative.step_list, alternative.input_data_list):
+            prefix = step.prefix
+            prefix_count[prefix] = prefix_count.get(prefix, 0) + 1
+            if prefix_count[prefix] > 1:
+                prefix = f"{prefix}_{prefix_count[prefix]}"
+            row[f"{prefix}.input_data_id"] = input_data.identifier
+            for param_name, value in input_data.params.items():
+                row[f"{prefix}.{param_name}"] = cls._to_column_value(value)
+        if isinstance(result, dict):
+            for key, value in result.items():
+                row[f"{cls.RESULT_COLUMN}.{key}"] = cls._to_column_value(value)
+        else:
+            row[cls.RESULT_COLUMN] = cls._to_column_value(result)
+        return row
+
+    @staticmethod
+    def _to_bytes_array(value_list: List[Any]):
+        """
+        Make a column of bytes from values of different types, serialized with dill except the bytes values.
+        """
+        pa = _import_pyarrow()
+        import dill
+        return pa.array([value if value is None or isinstance(value, bytes) else dill.dumps(value)
+                         for value in value_list], type=pa.binary())
+
+    @staticmethod
+    def _to_column_value(value: Any) -> Any:
+        """
+        Convert a value to a type that can be stored in a column. Values that are not scalars are stored as bytes
+        serialized with dill.
+        """
+        if value is None or isinstance(value, (bool, int, float, str, bytes)):
+            return value
+        if hasattr(value, "item") and getattr(value, "ndim", None) == 0:  # NumPy scalars
+            return value.item()
+        import dill
+        return dill.dumps(value)
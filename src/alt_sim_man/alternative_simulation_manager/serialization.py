@@ -0,0 +1,150 @@
+"""
+Serialization of the objects persisted by the simulation: step results, InputData parameters...
+
+The backend is selected per object type:
+    - NumPy arrays are saved as '.npy' files and loaded memory mapped, without copy;
+    - plain data (None, bool, int, float, str, lists and dictionaries with string keys of plain data) is saved with
+      msgpack if it is installed, with json otherwise;
+    - any other object, callables in particular, is saved with dill.
+The backend of a file is identified by its extension, and the backends are only imported when used.
+"""
+import functools
+import json
+import os
+from typing import Any, Optional
+
+BACKEND_EXTENSIONS = {"npy": ".npy", "msgpack": ".msgpack", "json": ".json", "dill": ".pkl"}
+# Range of the integers msgpack can store, from the minimum int64 to the maximum uint64
+MIN_PLAIN_INT = -2 ** 63
+MAX_PLAIN_INT = 2 ** 64 - 1
+
+
+@functools.lru_cache(maxsize=None)
+def _has_msgpack() -> bool:
+    """
+    Check once if msgpack is installed, as a failed import is attempted again at each call.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        return False
+    return True
+
+
+def is_numpy_array(obj: Any) -> bool:
+    """
+    Check if an object is a NumPy array that can be saved as a '.npy' file, without importing NumPy.
+    """
+    obj_type = type(obj)
+    return obj_type.__module__ == "numpy" and obj_type.__name__ in ("ndarray", "memmap") and \
+        obj.dtype != object
+
+
+def is_plain_data(obj: Any) -> bool:
+    """
+    Check if an object is plain data that can be saved with msgpack or json without loss.
+    Tuples are excluded, as they would be loaded as lists, and so are the integers out of the 64-bit range.
+    """
+    obj_type = type(obj)
+    if obj_type is int:
+        return MIN_PLAIN_INT <= obj <= MAX_PLAIN_INT
+    if obj is None or obj_type in (bool, float, str):
+        return True
+    if obj_type is list:
+        return all(is_plain_data(item) for item in obj)
+    if obj_type is dict:
+        return all(type(key) is str and is_plain_data(value) for key, value in obj.items())
+    return False
+
+
+def select_backend(obj: Any) -> str:
+    """
+    Select the serialization backend of an object.
+
+    :param obj: the object to serialize.
+    :return: str, name of the backend, a key of BACKEND_EXTENSIONS.
+    """
+    if is_numpy_array(obj):
+        return "npy"
+    if is_plain_data(obj):
+        return "msgpack" if _has_msgpack() else "json"
+    return "dill"
+
+
+def save_object(obj: Any, path_file_without_extension: str, backend: Optional[str] = None) -> str:
+    """
+    Save an object with the backend matching its type. The file is written to a temporary file first, so that an
+    interrupted save does not leave a corrupted file.
+
+    :param obj: the object to save.
+    :param path_file_without_extension: str, path of the file, the extension of the backend is added to it.
+    :param backend: str, name of the backend to use, selected from the type of the object if None.
+    :return: str, the path of the saved file.
+    """
+    backend = backend or select_backend(obj)
+    if backend not in BACKEND_EXTENSIONS:
+        raise ValueError(f"Invalid serialization backend '{backend}', expected one of: "
+                         f"{', '.join(BACKEND_EXTENSIONS)}")
+    path_file = path_file_without_extension + BACKEND_EXTENSIONS[backend]
+    path_tmp_file = path_file + ".tmp"
+    try:
+        if backend == "npy":
+            import numpy
+            with open(path_tmp_file, "wb") as f:
+                numpy.save(f, obj, allow_pickle=False)
+        elif backend == "msgpack":
+            import msgpack
+            with open(path_tmp_file, "wb") as f:
+                msgpack.pack(obj, f)
+        elif backend == "json":
+            with open(path_tmp_file, "w") as f:
+                json.dump(obj, f)
+        else:
+            import dill
+            with open(path_tmp_file, "wb") as f:
+                dill.dump(obj, f)
+    except BaseException:
+        if os.path.isfile(path_tmp_file):
+            os.remove(path_tmp_file)
+        raise
+    os.replace(path_tmp_file, path_file)
+    return path_file
+
+
+def load_object(path_file: str, mmap: bool = True) -> Any:
+    """
+    Load an object saved with save_object, the backend is selected from the extension of the file.
+
+    :param path_file: str, path of the file.
+    :param mmap: bool, True to load the NumPy arrays memory mapped (read-only) instead of reading them in memory.
+    :return: the loaded object.
+    """
+    extension = os.path.splitext(path_file)[1]
+    if extension == BACKEND_EXTENSIONS["npy"]:
+        import numpy
+        return numpy.load(path_file, mmap_mode="r" if mmap else None, allow_pickle=False)
+    if extension == BACKEND_EXTENSIONS["msgpack"]:
+        import msgpack
+        with open(path_file, "rb") as f:
+            return msgpack.unpack(f)
+    if extension == BACKEND_EXTENSIONS["json"]:
+        with open(path_file, "r") as f:
+            return json.load(f)
+    if extension == BACKEND_EXTENSIONS["dill"]:
+        import dill
+        with open(path_file, "rb") as f:
+            return dill.load(f)
+    raise ValueError(f"❌ Unknown serialization format for file: {path_file}")
+
+
+def find_object_file(path_file_without_extension: str) -> Optional[str]:
+    """
+    Find the file of an object saved with save_object, whatever its backend.
+
+    :param path_file_without_extension: str, path of the file without extension.
+    :return: str, the path of the file, None if there is none.
+    """
+    for extension in BACKEND_EXTENSIONS.values():
+        if os.path.isfile(path_file_without_extension + extension):
+            return path_file_without_extension + extension
+    return None
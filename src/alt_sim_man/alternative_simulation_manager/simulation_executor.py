@@ -1,57 +1,819 @@
 """
-
+Execution of the simulation tree of the alternatives.
 """
 
-import dill
 import os
+import heapq
+import math
+import time
 import logging
-from typing import Callable, Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterator, List, Optional
 
 from .alternative import Alternative
+from .results_store import ResultStore
+from .serialization import is_numpy_array
+from .simulation_tree import iter_group_alternatives, walk_tree_depth_first
+from .step_statistics import StepStatistics
+from .simulation_status import SimulationStatus
+from .worker import get_step, make_step_key, run_batch, run_batch_task
+from .worker_pool import WorkerPool, get_shared_worker_pool
 from ..utils import create_dir
 
 
+class SimulationNode:
+    """
+    Node of the simulation tree: a simulation step run once for a group of alternatives sharing the same previous
+    steps and input data. The step is run by the first alternative of the group, the representative.
 
-class SimulationExecutor:
+    The node can run as soon as the nodes of the steps it depends on have run, even if its parent has not run yet.
+    Its result is kept until all the nodes of its sub-tree have run and all its ancestors have run, unless it is
+    spilled to make room for other results, it is then loaded again from the alternative folder when needed.
+    """
+
+    def __init__(self, step_index: int, group: list, parent: Optional['SimulationNode'] = None):
+        """
+        :param step_index: int, index of the step in the alternatives.
+        :param group: list, the group of the simulation tree, the alternatives sharing this node followed by the
+            sub-groups.
+        :param parent: SimulationNode, the node of the previous step, None for the root nodes.
+        """
+        self.step_index = step_index
+        self.group = group
+        self.parent = parent
+        self.children: List['SimulationNode'] = []
+        self.dependency_node_list: List['SimulationNode'] = []  # Nodes of the steps this step depends on
+        self.dependent_node_list: List['SimulationNode'] = []  # Nodes of the steps depending on this step
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the execution state of the node.
+        """
+        self.has_run = False
+        self.is_restored = False  # Run in a previous run
+        self.is_chain_restored = False  # The node and all its ancestors were run in a previous run
+        self.result = None
+        self.is_result_loaded = False
+        self.duration = None
+        self.num_pending_dependencies = 0
+        self.num_failed_attempts = 0
+        self.has_failed = False  # The node, or one of its ancestors, failed
+        self.is_running = False
+        self.deadline = None  # Time limit of the current run, for the steps with a timeout
+        self.num_pending_children = 0  # Children whose sub-tree has not completely run
+        self.is_chain_done = False  # The node and all its ancestors have run
+        self.is_subtree_done = False  # The node and all its descendants have run
 
-    def __init__(self,alternative_list:List[Alternative],simulation_tree):
+    def __repr__(self):
+        return self.identifier
+
+    @property
+    def identifier(self):
+        return f"{self.representative.identifier}:{self.step_index}"
+
+    @property
+    def representative(self) -> Alternative:
+        return self.group[0]
+
+    @property
+    def num_alternatives(self):
+        return len(self.group) - 1
+
+    @property
+    def step(self):
+        return self.representative.step_list[self.step_index]
+
+    @property
+    def input_data(self):
+        return self.representative.input_data_list[self.step_index]
+
+    def iter_alternatives(self):
         """
+        Iterate over the alternatives sharing this node.
+        """
+        return iter_group_alternatives(self.group)
 
+    def iter_completed_alternatives(self):
+        """
+        Iterate over the alternatives whose last step is this node.
+        """
+        return (alternative for alternative in self.iter_alternatives() if alternative.num_step == self.step_index + 1)
+
+
+class SimulationExecutor:
+    """
+    Run the simulation tree of a list of alternatives. Each node of the tree is run once, by the representative
+    alternative of the node, and its result is shared with all the alternatives of the node.
+    """
+    MEMORY_PRESSURE_RATIO = 0.8  # Share of the memory budget above which the sub-trees are run depth-first
+
+    def __init__(self, alternative_list: List[Alternative], simulation_tree: list):
+        """
+        :param alternative_list: list of the alternatives to simulate.
+        :param simulation_tree: the tree of the alternatives, as generated by
+            AlternativeSimulationManager.group_alternatives_to_tree.
         """
         self._alternative_list = alternative_list
         self._simulation_tree = simulation_tree
         # Config
+        self._path_simulation_folder: Optional[str] = None
+        self._result_store: Optional[ResultStore] = None
+        self._collected_alternative_id_set = set()  # Alternatives already in the result store
+        self._progress_dict: Dict[str, dict] = {}
+        self._step_key_dict: Dict[int, tuple] = {}
+        self._step_statistics = StepStatistics()  # Statistics of the steps run by the current run
+        self._status: Optional[SimulationStatus] = None
+        self._status_update_interval = 1.
+        self._batch_duration = 0.05
+        self._previous_step_statistics = StepStatistics()  # Statistics of the previous runs, to size the batches
+        self._retry_heap: List[tuple] = []  # Time of the retry, counter and node of the nodes waiting for a retry
+        self._retry_counter = 0
+        self._memory_budget: Optional[int] = None
+        self._live_result_dict: Dict[SimulationNode, int] = OrderedDict()  # Memory held by the results in memory
+        self._live_result_size = 0
+        self._peak_live_result_size = 0
+        self._failed_node_list: List[SimulationNode] = []
+        self._root_node_list: List[SimulationNode] = self._build_node_tree()
+
+    @property
+    def root_node_list(self):
+        return self._root_node_list
+
+    @property
+    def failed_node_list(self):
+        return self._failed_node_list
+
+    @property
+    def live_result_size(self):
+        return self._live_result_size
+
+    @property
+    def peak_live_result_size(self):
+        return self._peak_live_result_size
+
+    def _build_node_tree(self) -> List[SimulationNode]:
+        """
+        Convert the nested lists of the simulation tree into SimulationNode objects and resolve the dependencies of
+        each node among its ancestors.
+        """
+        root_node_list = []
+        ancestor_list: List[SimulationNode] = []  # Ancestors of the current node, indexed by step
+        for step_index, group in walk_tree_depth_first(self._simulation_tree):
+            del ancestor_list[step_index:]
+            parent = ancestor_list[-1] if ancestor_list else None
+            node = SimulationNode(step_index=step_index, group=group, parent=parent)
+            node.dependency_node_list = self._resolve_dependency_nodes(node)
+            for dependency_node in node.dependency_node_list:
+                dependency_node.dependent_node_list.append(node)
+            if parent is None:
+                root_node_list.append(node)
+            else:
+                parent.children.append(node)
+            ancestor_list.append(node)
+        return root_node_list
+
+    def iter_nodes_depth_first(self) -> Iterator[SimulationNode]:
+        """
+        Iterate over all the nodes of the tree, depth-first.
+        """
+        node_stack = list(reversed(self._root_node_list))
+        while node_stack:
+            node = node_stack.pop()
+            yield node
+            node_stack.extend(reversed(node.children))
+
+    def iter_ready_nodes(self) -> Iterator[SimulationNode]:
+        """
+        Iterate over the nodes that have not run yet and whose dependencies have all run.
+        """
+        return (node for node in self.iter_nodes_depth_first() if not node.has_run and
+                all(dependency_node.has_run for dependency_node in node.dependency_node_list))
 
+    @staticmethod
+    def _resolve_dependency_nodes(node: SimulationNode) -> List[SimulationNode]:
+        """
+        Find the nodes providing the results the step of a node depends on, the closest ancestor running the
+        dependency step.
+        """
+        dependency_node_list = []
+        for dependency in node.step.dependencies:
+            ancestor = node.parent
+            while ancestor is not None and ancestor.step.name != dependency:
+                ancestor = ancestor.parent
+            if ancestor is None:
+                raise ValueError(f"Step '{node.step.name}' of Alternative '{node.representative.identifier}' depends "
+                                 f"on step '{dependency}' that is not run before it")
+            dependency_node_list.append(ancestor)
+        return dependency_node_list
 
-    def run(self,path_simulation_folder:str, overwrite:bool=False,run_in_parallel:Optional[bool]=False,):
+    def run(self, path_simulation_folder: str, overwrite: bool = False, run_in_parallel: Optional[bool] = False,
+            num_workers: Optional[int] = None, result_store: Optional[ResultStore] = None,
+            worker_pool: Optional[WorkerPool] = None, status_update_interval: float = 1.,
+            batch_duration: float = 0.05, memory_budget: Optional[int] = None):
         """
 
         :param path_simulation_folder:
         :param overwrite: bool, True if all the alternative simulation folders should be overwritten. If False and some
             folder are already present (due to a simulation that was interrupted), the simulation will start again from
             where it stopped.
+        :param run_in_parallel: bool, True to run the independent nodes of the tree in parallel worker processes.
+        :param num_workers: int, number of worker processes, the number of CPUs if None. Ignored if a worker pool
+            is given.
+        :param result_store: ResultStore, store collecting the result of each alternative once it is completed.
+            Alternatives already in the store are not collected again, the ones completed by a previous run that are
+            missing from it are collected when the simulation is resumed. The buffered results are written even if
+            the run is interrupted. The store is cleared if overwrite is True.
+        :param worker_pool: WorkerPool, the pool running the steps in parallel. By default, the pool shared by all
+            the runs of the process is used, so that its workers and the steps they have set up are reused.
+        :param status_update_interval: float, minimum time in seconds between two updates of the status snapshot of
+            the simulation, see simulation_status.read_status. The final state of the simulation is written at the
+            end of the run, 'completed', 'interrupted' or 'failed' if the run raised an error.
+        :param batch_duration: float, targeted duration in seconds of a batch of cheap leaf nodes. The sibling leaf
+            nodes of a step are run together in batches sized from the observed durations of the step, so that the
+            cost of dispatching a run is paid once per batch. 0 to run each node separately.
+        :param memory_budget: int, maximum memory in bytes held by the results kept in memory for the nodes still to
+            run, None for no limit. The least recently used results are spilled over the budget, they are loaded
+            again from the alternative folders when needed, NumPy arrays being memory mapped. Above 80 % of the
+            budget, the parallel workers only start new sub-trees when no node is running.
         :return:
         """
 
         # Check path
         if not os.path.isdir(path_simulation_folder):
             os.mkdir(path_simulation_folder)
+        self._path_simulation_folder = path_simulation_folder
+        self._result_store = result_store
+        self._collected_alternative_id_set = set()
+        if result_store is not None:
+            if overwrite:
+                # The results of the previous runs are overwritten, as the alternative folders
+                result_store.clear()
+            else:
+                self._collected_alternative_id_set = result_store.read_alternative_ids()
+        self._step_statistics = StepStatistics()
+        self._status_update_interval = status_update_interval
+        self._batch_duration = batch_duration
+        self._memory_budget = memory_budget
+        self._previous_step_statistics = StepStatistics.load(path_simulation_folder)
+        self.init_simulation(path_simulation_folder, overwrite=overwrite)
 
+        # The stack is in depth-first order, to release the results of the nodes as soon as possible
+        self._live_result_dict = OrderedDict()
+        self._live_result_size = 0
+        self._peak_live_result_size = 0
+        ready_node_stack = self._init_nodes()
+        self._retry_heap = []
+        self._failed_node_list = []
+        state = "failed"
+        try:
+            try:
+                self._collect_restored_nodes()
+                self._run_nodes(ready_node_stack, run_in_parallel, num_workers, worker_pool)
+            except BaseException:
+                if result_store is not None:
+                    self._close_result_store_after_error(result_store)
+                raise
+            if result_store is not None:
+                result_store.close()
+            self._save_step_statistics()
+            state = "completed"
+        except KeyboardInterrupt:
+            state = "interrupted"
+            raise
+        finally:
+            self._status.finish(state=state)
+        if self._failed_node_list:
+            logging.warning(f"{len(self._failed_node_list)} simulation steps failed, their sub-trees were not run: "
+                            f"{', '.join(node.identifier for node in self._failed_node_list)}")
 
-    def init_simulation(self,path_simulation_folder):
+    @staticmethod
+    def _close_result_store_after_error(result_store: ResultStore) -> None:
         """
+        Write the buffered results of a run that raised an error, logging the error of the store if it fails too
+        instead of hiding the one of the run.
+        """
+        try:
+            result_store.close()
+        except Exception as e:
+            logging.error(f"The buffered results could not be written to the result store: {type(e).__name__}: {e}")
 
-        :param path_simulation_folder:
-        :return:
+    def _run_nodes(self, ready_node_stack: List[SimulationNode], run_in_parallel: bool, num_workers: Optional[int],
+                   worker_pool: Optional[WorkerPool]):
+        """
+        Run the nodes of the tree, starting with the ready ones.
+        """
+        if run_in_parallel:
+            self._run_in_parallel(ready_node_stack, worker_pool=worker_pool or get_shared_worker_pool(num_workers))
+        else:
+            while ready_node_stack or self._retry_heap:
+                node_batch = self._pop_batch(ready_node_stack, wait_for_retry=True)
+                if not node_batch:
+                    continue
+                for node in node_batch:
+                    self._start_node(node)
+                try:
+                    # Run the setup of the step in this process if it was not done yet
+                    sim_step = get_step(self._get_step_key(node_batch[0].step)[0], sim_step=node_batch[0].step)
+                    output_list = run_batch(sim_step, [node.input_data for node in node_batch],
+                                            self._get_inputs(node_batch[0]))
+                except Exception as e:
+                    output_list = [(None, None, f"{type(e).__name__}: {e}")] * len(node_batch)
+                self._collect_batch(node_batch, output_list, ready_node_stack)
+
+    def _save_step_statistics(self):
+        """
+        Add the statistics of the steps run by this run to the ones of the previous runs of the simulation folder.
+        """
+        step_statistics = StepStatistics.load(self._path_simulation_folder)
+        step_statistics.merge(self._step_statistics)
+        step_statistics.save(self._path_simulation_folder)
+
+    def _run_in_parallel(self, ready_node_stack: List[SimulationNode], worker_pool: WorkerPool):
+        """
+        Run the nodes in a pool of worker processes. The nodes depending on a node are submitted once it is
+        completed, the independent nodes run concurrently.
+        The workers are killed if a step exceeds its timeout, the other running steps are then submitted again. If a
+        worker crashes, the steps that were running become suspects: they are run again one at a time along with the
+        other steps, until one crashes a worker while running alone.
+        """
+        import dill
+        running_dict = {}  # Batches of nodes running, by future
+        suspect_node_list = []  # Nodes that were running when a worker crashed
+        running_suspect_node = None
+        while ready_node_stack or running_dict or self._retry_heap or suspect_node_list:
+            if suspect_node_list and (running_suspect_node is None or not running_suspect_node.is_running):
+                # The suspects are run one at a time, along with the other nodes
+                running_suspect_node = suspect_node_list[-1]
+                if self._submit_batch(worker_pool, [running_suspect_node], running_dict) or not running_dict:
+                    suspect_node_list.pop()
+            while len(running_dict) < worker_pool.num_workers:
+                # Under memory pressure, the sub-trees already started are completed before starting new ones
+                node_batch = self._pop_batch(ready_node_stack, num_workers=worker_pool.num_workers,
+                                             leaf_only=bool(running_dict) and self._is_memory_pressure())
+                if not node_batch:
+                    break
+                if not self._submit_batch(worker_pool, node_batch, running_dict):
+                    if running_dict:
+                        # A worker crashed, it is handled once the running nodes are collected
+                        ready_node_stack.extend(reversed(node_batch))
+                        break
+            if not running_dict:
+                if not ready_node_stack:
+                    self._wait_for_retry()
+                continue
+
+            deadline_list = [node.deadline for node_batch in running_dict.values() for node in node_batch
+                             if node.deadline is not None]
+            if self._retry_heap:
+                deadline_list.append(self._retry_heap[0][0])
+            timeout = max(0., min(deadline_list) - time.monotonic()) if deadline_list else None
+            done_set, _ = wait(running_dict, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            crashed_node_list = []
+            for future in done_set:
+                node_batch = running_dict.pop(future)
+                try:
+                    output_list = dill.loads(future.result())
+                except BrokenExecutor:
+                    crashed_node_list.extend(node_batch)
+                    continue
+                except Exception as e:
+                    output_list = [(None, None, f"{type(e).__name__}: {e}")] * len(node_batch)
+                self._collect_batch(node_batch, output_list, ready_node_stack)
+
+            current_time = time.monotonic()
+            running_node_list = [node for node_batch in running_dict.values() for node in node_batch]
+            timed_out_node_list = [node for node in running_node_list
+                                   if node.deadline is not None and node.deadline <= current_time]
+            if not crashed_node_list and not timed_out_node_list:
+                continue
+            # The pool can not be used anymore, or one of its workers hangs
+            worker_pool.terminate()
+            for node in timed_out_node_list:
+                self._fail_attempt(node, f"Timeout after {node.step.timeout} s")
+            interrupted_node_list = [node for node in running_node_list if node not in timed_out_node_list]
+            running_dict.clear()
+            if not crashed_node_list:
+                for node in interrupted_node_list:
+                    self._stop_node(node)
+                    ready_node_stack.append(node)
+            elif len(crashed_node_list) + len(interrupted_node_list) == 1:
+                # The node was running alone, it crashed the worker
+                self._fail_attempt(crashed_node_list[0], "Worker process crashed")
+            else:
+                for node in crashed_node_list + interrupted_node_list:
+                    self._stop_node(node)
+                    suspect_node_list.append(node)
+
+    def _submit_batch(self, worker_pool: WorkerPool, node_batch: List[SimulationNode], running_dict: dict) -> bool:
+        """
+        Submit a batch of sibling nodes of the same step to the worker pool.
+        If a crashed worker broke the pool while no node is running, the pool is restarted and the batch submitted
+        again, its nodes fail an attempt if the restarted pool is broken too.
+
+        :return: bool, False if the batch was not submitted. If nodes are running, the batch should be submitted again
+            once they are collected, otherwise its nodes failed an attempt.
+        """
+        import dill
+        step_key, step_payload = self._get_step_key(node_batch[0].step)
+        task_payload = dill.dumps(([node.input_data for node in node_batch], self._get_inputs(node_batch[0])))
+        try:
+            future = worker_pool.submit(run_batch_task, step_key, step_payload, task_payload)
+        except BrokenExecutor:
+            if running_dict:
+                return False
+            # Nothing is lost by killing the workers
+            worker_pool.terminate()
+            try:
+                future = worker_pool.submit(run_batch_task, step_key, step_payload, task_payload)
+            except BrokenExecutor:
+                worker_pool.terminate()
+                for node in node_batch:
+                    self._fail_attempt(node, "Worker pool broken")
+                return False
+        for node in node_batch:
+            self._start_node(node)
+            node.deadline = time.monotonic() + node.step.timeout if node.step.timeout is not None else None
+        running_dict[future] = node_batch
+        return True
+
+    def _collect_batch(self, node_batch: List[SimulationNode], output_list: List[tuple],
+                       ready_node_stack: List[SimulationNode]):
+        """
+        Complete the nodes of a batch that succeeded, the others failed an attempt.
+
+        :param output_list: the result, duration and error message of each node, as returned by worker.run_batch.
+        """
+        for node, (result, duration, error) in zip(node_batch, output_list):
+            if error is None:
+                self._complete_node(node, result, duration, ready_node_stack)
+            else:
+                self._fail_attempt(node, error)
+
+    def _get_batch_size(self, sim_step) -> int:
+        """
+        Get the maximum number of nodes of a step run in a batch, so that the batch lasts about the batch duration.
+        The nodes of the steps with a timeout are run separately, so that the one exceeding it is known.
+        """
+        if self._batch_duration <= 0 or sim_step.timeout is not None:
+            return 1
+        mean_duration = self._step_statistics.mean_duration(sim_step.name)
+        if mean_duration is None:
+            mean_duration = self._previous_step_statistics.mean_duration(sim_step.name)
+        if mean_duration is None:
+            # The step never ran, it is run alone to measure its duration
+            return 1
+        return max(1, int(self._batch_duration / max(mean_duration, 1e-9)))
+
+    def _pop_batch(self, ready_node_stack: List[SimulationNode], num_workers: int = 1,
+                   wait_for_retry: bool = False, leaf_only: bool = False) -> List[SimulationNode]:
+        """
+        Get the next nodes to run: the next ready node, followed by the ready sibling leaf nodes of the same step if
+        it is a cheap leaf node. The siblings share the results of their dependencies, and the leaf nodes have no
+        dependent node waiting for them. The batch is split between the workers if there are not enough siblings
+        ready to fill a batch per worker.
+
+        :param ready_node_stack: the stack of the ready nodes, the siblings of a node are next to it.
+        :param num_workers: int, number of workers running the batches.
+        :param wait_for_retry: bool, True to wait for the next retry if no node is ready.
+        :param leaf_only: bool, True to only run leaf nodes, whose results are not kept.
+        :return: the nodes of the batch, an empty list if there is no node to run.
+        """
+        node = self._pop_ready_node(ready_node_stack, wait_for_retry=wait_for_retry, leaf_only=leaf_only)
+        if node is None:
+            return []
+        if node.children:
+            return [node]
+        max_batch_size = self._get_batch_size(node.step)
+        if max_batch_size == 1:
+            return [node]
+        num_siblings = 0
+        for sibling in reversed(ready_node_stack[-max_batch_size * num_workers:]):
+            if sibling.parent is not node.parent or sibling.step is not node.step or sibling.children or \
+                    sibling.has_failed:
+                break
+            num_siblings += 1
+        batch_size = min(max_batch_size, math.ceil((num_siblings + 1) / num_workers))
+        node_batch = [node]
+        for _ in range(batch_size - 1):
+            node_batch.append(ready_node_stack.pop())
+        return node_batch
+
+    def _pop_ready_node(self, ready_node_stack: List[SimulationNode], wait_for_retry: bool = False,
+                        leaf_only: bool = False) -> Optional[SimulationNode]:
+        """
+        Get the next node to run, the nodes whose retry delay has passed being added to the ready nodes first.
+
+        :param ready_node_stack: the stack of the ready nodes.
+        :param wait_for_retry: bool, True to wait for the next retry if no node is ready.
+        :param leaf_only: bool, True to get the next leaf node, the other nodes staying in the stack.
+        :return: the node to run, None if there is none.
+        """
+        current_time = time.monotonic()
+        while self._retry_heap and self._retry_heap[0][0] <= current_time:
+            ready_node_stack.append(heapq.heappop(self._retry_heap)[2])
+        if leaf_only:
+            for index in range(len(ready_node_stack) - 1, -1, -1):
+                node = ready_node_stack[index]
+                if not node.children and not node.has_failed:
+                    del ready_node_stack[index]
+                    return node
+            return None
+        while ready_node_stack:
+            node = ready_node_stack.pop()
+            # The sub-trees of the failed nodes are not run
+            if not node.has_failed:
+                return node
+        if wait_for_retry:
+            self._wait_for_retry()
+        return None
+
+    def _wait_for_retry(self):
+        """
+        Wait until the next node waiting for a retry can run, if there is one.
+        """
+        if self._retry_heap:
+            time.sleep(max(0., self._retry_heap[0][0] - time.monotonic()))
+
+    def _start_node(self, node: SimulationNode):
+        node.is_running = True
+        self._status.start_node(node.identifier, node.step.name)
+
+    def _stop_node(self, node: SimulationNode):
+        node.is_running = False
+        self._status.stop_node(node.identifier)
+
+    def _fail_attempt(self, node: SimulationNode, error: str):
+        """
+        Handle a failed run of a node: it is retried after a delay if it has retries left, otherwise the node fails.
+        """
+        node.num_failed_attempts += 1
+        if node.num_failed_attempts > node.step.max_retries:
+            self._fail_node(node, error)
+            return
+        logging.warning(f"Step '{node.step.name}' of node '{node.identifier}' failed, retry "
+                        f"{node.num_failed_attempts}/{node.step.max_retries}: {error}")
+        self._stop_node(node)
+        retry_time = time.monotonic() + node.step.retry_backoff * 2 ** (node.num_failed_attempts - 1)
+        self._retry_counter += 1
+        heapq.heappush(self._retry_heap, (retry_time, self._retry_counter, node))
+
+    def _fail_node(self, node: SimulationNode, error: str):
+        """
+        Mark a node and the nodes of its sub-tree that have not run as failed, the other nodes keep running. The
+        results of the nodes of the sub-tree are released, as the alternatives of the sub-tree are not completed.
+        The failure is recorded in the progress files of the alternatives of the node, so that the sub-tree is run
+        again if the simulation is resumed.
+        """
+        node.has_failed = True
+        node.is_running = False
+        self._failed_node_list.append(node)
+        for alternative in node.iter_alternatives():
+            alternative.update_progress_json_file_after_fail_step(
+                self._path_simulation_folder, node.step_index, error,
+                parent_alternative=node.representative.identifier)
+        num_skipped_nodes = 0
+        node_stack = list(node.children)
+        while node_stack:
+            descendant = node_stack.pop()
+            self._drop_result(descendant)
+            # The running nodes complete normally
+            if not descendant.has_run and not descendant.has_failed and not descendant.is_running:
+                descendant.has_failed = True
+                num_skipped_nodes += 1
+            node_stack.extend(descendant.children)
+        self._status.fail_node(node.identifier, num_skipped_nodes=num_skipped_nodes)
+        # Nothing else will run in the sub-tree
+        node.is_subtree_done = True
+        if node.parent is not None:
+            node.parent.num_pending_children -= 1
+            self._update_subtree_done(node.parent)
+
+    def _get_step_key(self, sim_step) -> tuple:
+        """
+        Get the key and the serialized SimulationStep sent to the workers, computed once per step and per executor.
+        """
+        if id(sim_step) not in self._step_key_dict:
+            self._step_key_dict[id(sim_step)] = make_step_key(sim_step)
+        return self._step_key_dict[id(sim_step)]
+
+    def init_simulation(self, path_simulation_folder: str, overwrite: bool = False):
+        """
+        Make one folder and one progress file per alternative. The progress of the alternatives already initialized
+        is read to resume the simulation.
+
+        :param path_simulation_folder: str, path to the simulation folder containing all the alternative sub-folders
+        :param overwrite: bool, True if the alternative folders should be overwritten.
+        """
+        self._progress_dict = {}
+        for alternative in self._alternative_list:
+            if overwrite or not alternative.has_progress_json_file(path_simulation_folder):
+                alternative.make_alternative_dir(path_simulation_folder, overwrite=overwrite)
+                alternative.init_progress_json_file(path_simulation_folder)
+            else:
+                self._progress_dict[alternative.identifier] = alternative.read_progress_json_file(
+                    path_simulation_folder)
+
+    def _init_nodes(self) -> List[SimulationNode]:
+        """
+        Reset the execution state of the nodes, restore the nodes run in a previous run and gather the nodes ready to
+        run, whose dependencies have all run.
+
+        :return: the stack of the ready nodes, the first node to run being at the end.
+        """
+        node_list = list(self.iter_nodes_depth_first())
+        # Parents before children
+        for node in node_list:
+            node.reset()
+            node.has_run = node.is_restored = self._is_node_restorable(node)
+            node.is_chain_done = node.has_run and (node.parent is None or node.parent.is_chain_done)
+            node.is_chain_restored = node.is_restored and (node.parent is None or node.parent.is_chain_restored)
+        self._status = SimulationStatus(self._path_simulation_folder, num_nodes=len(node_list),
+                                        num_restored_nodes=sum(1 for node in node_list if node.is_restored),
+                                        update_interval=self._status_update_interval)
+        # Children before parents
+        ready_node_stack = []
+        for node in reversed(node_list):
+            node.num_pending_children = sum(1 for child in node.children if not child.is_subtree_done)
+            node.is_subtree_done = node.has_run and node.num_pending_children == 0
+            if not node.has_run:
+                node.num_pending_dependencies = sum(1 for dependency_node in node.dependency_node_list
+                                                    if not dependency_node.has_run)
+                if node.num_pending_dependencies == 0:
+                    ready_node_stack.append(node)
+        return ready_node_stack
+
+    def _is_node_restorable(self, node: SimulationNode) -> bool:
         """
+        Check if the representative of a node already ran it in a previous run. The result of a restored node is only
+        loaded when needed.
+        """
+        progress = self._progress_dict.get(node.representative.identifier)
+        if progress is None:
+            return False
+        step_progress = progress[str(node.step_index)]
+        if not step_progress["has_run"] or step_progress["parent_alternative"] != node.representative.identifier:
+            return False
+        node.duration = step_progress["duration"]
+        return True
+
+    def _get_node_result(self, node: SimulationNode) -> Any:
+        """
+        Get the result of a node that has run, loading it from the alternative folder if needed.
+        """
+        if not node.is_result_loaded:
+            path_result_file = node.representative.find_step_result_file(self._path_simulation_folder,
+                                                                         node.step_index)
+            result = node.representative.load_step_result(self._path_simulation_folder, node.step_index)
+            self._hold_result(node, result, self._estimate_result_size(result, path_result_file))
+        elif node in self._live_result_dict:
+            self._live_result_dict.move_to_end(node)
+        return node.result
 
-        #
-        # Make one folder per alternative
+    @staticmethod
+    def _estimate_result_size(result: Any, path_result_file: str) -> int:
+        """
+        Estimate the memory held by a result: the size of the data of a NumPy array, none for a memory mapped array as
+        its pages are read from the disk when needed, the size of its file otherwise.
+        """
+        if is_numpy_array(result):
+            return 0 if type(result).__name__ == "memmap" else result.nbytes
+        return os.path.getsize(path_result_file)
 
-        # make one progress.json for the global simulation and one per alternative
+    def _hold_result(self, node: SimulationNode, result: Any, result_size: int):
+        """
+        Keep the result of a node in memory, the least recently used results being spilled if the memory budget is
+        exceeded. The result of the node itself is kept, even if it exceeds the budget alone.
+        """
+        node.result = result
+        node.is_result_loaded = True
+        self._live_result_dict[node] = result_size
+        self._live_result_size += result_size
+        if self._memory_budget is not None:
+            for cold_node in list(self._live_result_dict):
+                if self._live_result_size <= self._memory_budget:
+                    break
+                if cold_node is not node:
+                    # The result is already saved in the alternative folder
+                    self._drop_result(cold_node)
+        self._peak_live_result_size = max(self._peak_live_result_size, self._live_result_size)
 
+    def _drop_result(self, node: SimulationNode):
+        """
+        Remove the result of a node from memory.
+        """
+        self._live_result_size -= self._live_result_dict.pop(node, 0)
+        node.result = None
+        node.is_result_loaded = False
 
+    def _is_memory_pressure(self) -> bool:
+        """
+        Check if the results in memory are close to the memory budget.
+        """
+        return self._memory_budget is not None and \
+            self._live_result_size > self.MEMORY_PRESSURE_RATIO * self._memory_budget
 
+    def _get_inputs(self, node: SimulationNode) -> List[Any]:
+        """
+        Get the results of the dependencies of a node.
+        """
+        return [self._get_node_result(dependency_node) for dependency_node in node.dependency_node_list]
 
-    def alternative_
+    def _complete_node(self, node: SimulationNode, result: Any, duration: float,
+                       ready_node_stack: List[SimulationNode]):
+        """
+        Save the result of a node, update the progress of its alternatives, add the nodes depending on it that are
+        now ready to the stack and collect the results of the alternatives completed.
+        """
+        path_result_file = node.representative.save_step_result(self._path_simulation_folder, node.step_index, result)
+        self._step_statistics.add_run(node.step.name, duration, result_size=os.path.getsize(path_result_file))
+        # The node may have been running when one of its ancestors failed, its sub-tree is then not run
+        has_failed_ancestor = self._has_failed_ancestor(node)
+        if not has_failed_ancestor:
+            self._hold_result(node, result, self._estimate_result_size(result, path_result_file))
+        for alternative in node.iter_alternatives():
+            alternative.update_progress_json_file_after_run_step(
+                self._path_simulation_folder, node.step_index, duration,
+                parent_alternative=node.representative.identifier)
+        node.has_run = True
+        node.is_running = False
+        node.duration = duration
+        self._status.complete_node(node.identifier)
+        if has_failed_ancestor:
+            return
+        for dependent_node in reversed(node.dependent_node_list):
+            dependent_node.num_pending_dependencies -= 1
+            if dependent_node.num_pending_dependencies == 0 and not dependent_node.has_run:
+                ready_node_stack.append(dependent_node)
+        self._update_chain_done(node)
+        self._update_subtree_done(node)
 
+    @staticmethod
+    def _has_failed_ancestor(node: SimulationNode) -> bool:
+        ancestor = node.parent
+        while ancestor is not None:
+            if ancestor.has_failed:
+                return True
+            ancestor = ancestor.parent
+        return False
+
+    def _update_chain_done(self, node: SimulationNode):
+        """
+        Mark a node that has just run, and its descendants that have already run, as having all their ancestors run
+        if it is the case. The alternatives completed by these nodes are collected, a restored node can complete its
+        alternatives when one of its ancestors runs after it.
+        """
+        if node.parent is not None and not node.parent.is_chain_done:
+            return
+        node_stack = [node]
+        while node_stack:
+            node = node_stack.pop()
+            node.is_chain_done = True
+            self._collect_node(node)
+            self._release_if_unused(node)
+            node_stack.extend(child for child in node.children if child.has_run)
+
+    def _collect_node(self, node: SimulationNode):
+        """
+        Add the results of the alternatives completed by a node to the result store, if they are not in it yet.
+        """
+        if self._result_store is None:
+            return
+        for alternative in node.iter_completed_alternatives():
+            if alternative.identifier not in self._collected_alternative_id_set:
+                self._result_store.add_result(alternative, self._get_node_result(node))
+                self._collected_alternative_id_set.add(alternative.identifier)
+
+    def _collect_restored_nodes(self):
+        """
+        Collect the alternatives completed by a previous run that are missing from the result store, as the results
+        buffered by an interrupted run can be lost.
+        """
+        if self._result_store is None:
+            return
+        for node in self.iter_nodes_depth_first():
+            if node.is_chain_restored:
+                self._collect_node(node)
+                self._release_if_unused(node)
+
+    def _update_subtree_done(self, node: SimulationNode):
+        """
+        Mark a node that has just run, and its ancestors, as having all their descendants run if it is the case.
+        """
+        while node.has_run and node.num_pending_children == 0:
+            node.is_subtree_done = True
+            self._release_if_unused(node)
+            if node.parent is None:
+                return
+            node = node.parent
+            node.num_pending_children -= 1
+
+    def _release_if_unused(self, node: SimulationNode):
+        """
+        Release the result of a node once all its descendants have run, as they are the only nodes that can depend on
+        it, and all its ancestors have run, as its alternatives are then completed.
+        """
+        if node.is_subtree_done and node.is_chain_done:
+            self._drop_result(node)
@@ -0,0 +1,178 @@
+"""
+Compact status snapshot of a running simulation, to monitor it without reading the progress files of the
+alternatives.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+class SimulationStatus:
+    """
+    Track the state of the nodes of a simulation and write a snapshot of it in the simulation folder.
+    The counters are updated in constant time at each event, and the snapshot is written at most once per update
+    interval, so that the monitoring does not slow down the simulation.
+    """
+    NAME_STATUS_FILE = "status.json"
+    NUM_SLOWEST_NODES = 5
+    FINAL_STATES = ("completed", "interrupted", "failed")
+
+    def __init__(self, path_simulation_folder: str, num_nodes: int, num_restored_nodes: int = 0,
+                 update_interval: float = 1.):
+        """
+        :param path_simulation_folder: str, path to the simulation folder.
+        :param num_nodes: int, total number of nodes of the simulation tree.
+        :param num_restored_nodes: int, number of nodes already run in a previous run.
+        :param update_interval: float, minimum time between two writes of the snapshot, in seconds.
+        """
+        self._path_status_file = os.path.join(path_simulation_folder, self.NAME_STATUS_FILE)
+        self._num_nodes = num_nodes
+        self._num_restored_nodes = num_restored_nodes
+        self._update_interval = update_interval
+        self._num_done_nodes = 0
+        self._num_failed_nodes = 0
+        self._running_node_dict: Dict[str, tuple] = {}  # Step name and start time of the running nodes
+        self._start_time = time.time()
+        self._last_write_time = float("-inf")
+
+    @property
+    def num_pending_nodes(self):
+        return self._num_nodes - self._num_restored_nodes - self._num_done_nodes - self._num_failed_nodes - \
+            len(self._running_node_dict)
+
+    def start_node(self, node_id: str, step_name: str) -> None:
+        """
+        Mark a node as running.
+        """
+        self._running_node_dict[node_id] = (step_name, time.time())
+        self.write()
+
+    def complete_node(self, node_id: str) -> None:
+        """
+        Mark a running node as done.
+        """
+        del self._running_node_dict[node_id]
+        self._num_done_nodes += 1
+        self.write()
+
+    def stop_node(self, node_id: str) -> None:
+        """
+        Mark a running node as pending again, to be retried.
+        """
+        self._running_node_dict.pop(node_id, None)
+        self.write()
+
+    def fail_node(self, node_id: str, num_skipped_nodes: int = 0) -> None:
+        """
+        Mark a running node as failed, with the pending nodes of its sub-tree that will not run.
+
+        :param node_id: str, identifier of the failed node.
+        :param num_skipped_nodes: int, number of pending nodes of its sub-tree.
+        """
+        self._running_node_dict.pop(node_id, None)
+        self._num_failed_nodes += 1 + num_skipped_nodes
+        self.write()
+
+    def to_dict(self, state: str = "running") -> Dict[str, Any]:
+        """
+        Make the snapshot of the status.
+
+        :param state: str, state of the simulation, 'running' or one of the FINAL_STATES.
+        """
+        current_time = time.time()
+        elapsed_time = current_time - self._start_time
+        throughput = self._num_done_nodes / elapsed_time if elapsed_time > 0 else 0.
+        num_remaining_nodes = self.num_pending_nodes + len(self._running_node_dict)
+        slowest_running_node_list = sorted(self._running_node_dict.items(), key=lambda item: item[1][1])
+        return {
+            "state": state,
+            "start_time": self._start_time,
+            "update_time": current_time,
+            "num_nodes": self._num_nodes,
+            "counts": {
+                "pending": self.num_pending_nodes,
+                "running": len(self._running_node_dict),
+                "done": self._num_done_nodes,
+                "restored": self._num_restored_nodes,
+                "failed": self._num_failed_nodes,
+            },
+            "throughput": throughput,
+            "eta": num_remaining_nodes / throughput if throughput > 0 else None,
+            "slowest_running_nodes": [
+                {"node": node_id, "step": step_name, "elapsed_time": current_time - start_time}
+                for node_id, (step_name, start_time) in slowest_running_node_list[:self.NUM_SLOWEST_NODES]],
+        }
+
+    def write(self, force: bool = False, state: str = "running") -> None:
+        """
+        Write the snapshot in the status file if the update interval has passed since the last write.
+        The file is replaced atomically, so that it can be read at any time.
+
+        :param force: bool, True to write the snapshot whatever the time of the last write.
+        :param state: str, state of the simulation, 'running' or one of the FINAL_STATES.
+        """
+        current_time = time.monotonic()
+        if not force and current_time - self._last_write_time < self._update_interval:
+            return
+        self._last_write_time = current_time
+        with open(self._path_status_file + ".tmp", "w") as f:
+            json.dump(self.to_dict(state=state), f, indent=4)
+        os.replace(self._path_status_file + ".tmp", self._path_status_file)
+
+    def finish(self, state: str = "completed") -> None:
+        """
+        Write the final snapshot of the simulation.
+
+        :param state: str, final state of the simulation, one of the FINAL_STATES.
+        :raises ValueError: If the state is not a final state.
+        """
+        if state not in self.FINAL_STATES:
+            raise ValueError(f"❌ Invalid final state: {state}, expected one of {', '.join(self.FINAL_STATES)}")
+        self.write(force=True, state=state)
+
+
+def read_status(path_simulation_folder: str) -> Dict[str, Any]:
+    """
+    Read the status snapshot of a simulation.
+
+    :param path_simulation_folder: str, path to the simulation folder.
+    :return: dict, the snapshot.
+    :raises FileNotFoundError: If the simulation has no status file.
+    """
+    path_status_file = os.path.join(path_simulation_folder, SimulationStatus.NAME_STATUS_FILE)
+    if not os.path.isfile(path_status_file):
+        raise FileNotFoundError(f"❌ No status found in: {path_simulation_folder}")
+    with open(path_status_file, "r") as f:
+        return json.load(f)
+
+
+def format_status(status: Dict[str, Any]) -> str:
+    """
+    Format a status snapshot to be displayed.
+
+    :param status: dict, the snapshot, as returned by read_status.
+    :return: str
+    """
+    counts = status["counts"]
+    num_finished_nodes = counts["done"] + counts["restored"]
+    line_list = [
+        f"State: {status['state']} (updated {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status['update_time']))})",
+        f"Nodes: {num_finished_nodes}/{status['num_nodes']} finished "
+        f"({', '.join(f'{count} {state}' for state, count in counts.items())})",
+        f"Throughput: {status['throughput']:.2f} nodes/s",
+        f"ETA: {_format_duration(status['eta'])}",
+    ]
+    if status["slowest_running_nodes"]:
+        line_list.append("Slowest running nodes:")
+        line_list.extend(f"    {node['node']} ({node['step']}): {_format_duration(node['elapsed_time'])}"
+                         for node in status["slowest_running_nodes"])
+    return "\n".join(line_list)
+
+
+def _format_duration(duration: Optional[float]) -> str:
+    if duration is None:
+        return "unknown"
+    hours, remainder = divmod(int(duration), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
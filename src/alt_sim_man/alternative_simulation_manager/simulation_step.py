@@ -2,7 +2,6 @@
 
 """
 
-import dill
 import os
 from typing import Callable, List, Optional, Dict, Any
 
@@ -17,10 +16,22 @@ class SimulationStep:
     :param function: A callable function that represents the logic of this step.
             :param required_params: A list of dictionaries, each defining the parameter's name, type, and whether it is optional.
     :param dependencies: A list of other step names that this step depends on (optional).
+    :param setup: A callable without arguments run once per process before the first run of the step, to load
+        libraries or data shared by all the runs (optional).
+    :param teardown: A callable without arguments run once when a process that ran the setup exits (optional).
+    :param timeout: Maximum duration of a run of the step in seconds, None for no limit. It is only enforced when the
+        steps run in parallel worker processes, the worker running a step that times out is killed.
+    :param max_retries: Number of times a failed run of the step is retried before the step is considered failed.
+    :param retry_backoff: Delay before the first retry in seconds, doubled at each following retry.
+    :param batch_function: A vectorised version of the function, run on the InputData of many alternatives at once
+        (optional). It is called with the results of the dependencies as positional arguments, followed by the list of
+        the parameters of each InputData, and returns the list of the results in the same order.
     """
 
     def __init__(self, name: str, function: Callable, required_params: List[Dict[str, Any]],
-                 dependencies: Optional[List[str]] = None, parallelizable: Optional[bool] = False, prefix: Optional[str]=None):
+                 dependencies: Optional[List[str]] = None, parallelizable: Optional[bool] = False, prefix: Optional[str]=None,
+                 setup: Optional[Callable] = None, teardown: Optional[Callable] = None, timeout: Optional[float] = None,
+                 max_retries: int = 0, retry_backoff: float = 1., batch_function: Optional[Callable] = None):
         self._name = name
         self._function = function
         self._required_params = required_params
@@ -28,6 +39,12 @@ class SimulationStep:
         self._parallelizable = parallelizable
 
         self._prefix=prefix
+        self._setup = setup
+        self._teardown = teardown
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._batch_function = batch_function
 
     @property
     def name(self):
@@ -41,6 +58,10 @@ class SimulationStep:
     def required_params(self):
         return self._required_params
 
+    @property
+    def dependencies(self):
+        return self._dependencies
+
     @property
     def parallelizable(self):
         return self._parallelizable
@@ -49,16 +70,58 @@ class SimulationStep:
     def prefix(self):
         return self._prefix if self._prefix is not None else self._name
 
-    def run(self, inputs: List) -> any:
+    @property
+    def setup(self):
+        return self._setup
+
+    @property
+    def teardown(self):
+        return self._teardown
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @property
+    def max_retries(self):
+        return self._max_retries
+
+    @property
+    def retry_backoff(self):
+        return self._retry_backoff
+
+    @property
+    def batch_function(self):
+        return self._batch_function
+
+    def run(self, input_data: InputData, inputs: Optional[List] = None) -> any:
         """
         Run the simulation step.
+        The function is called with the results of the dependencies as positional arguments, in the order of
+        the dependencies, and with the parameters of the InputData as keyword arguments.
 
-        :param inputs: The inputs required for the simulation step.
+        :param input_data: The InputData of the step.
+        :param inputs: The results of the steps this step depends on.
         :return: The result of the simulation step.
         """
-        if self.result is None:  # Caching mechanism
-            self.result = self.function(*inputs)
-        return self.result
+        return self._function(*(inputs or []), **input_data.params)
+
+    def run_batch(self, input_data_list: List[InputData], inputs: Optional[List] = None) -> list:
+        """
+        Run the simulation step for several InputData sharing the same results of the dependencies, with the batch
+        function if the step has one, one InputData after the other otherwise.
+
+        :param input_data_list: The InputData of each run.
+        :param inputs: The results of the steps this step depends on.
+        :return: The list of the results, in the order of the InputData.
+        """
+        if self._batch_function is None:
+            return [self.run(input_data, inputs) for input_data in input_data_list]
+        result_list = list(self._batch_function(*(inputs or []), [input_data.params for input_data in input_data_list]))
+        if len(result_list) != len(input_data_list):
+            raise ValueError(f"The batch function of step {self._name} returned {len(result_list)} results for "
+                             f"{len(input_data_list)} InputData")
+        return result_list
 
     def generate_input_data(self, identifier: str, params: dict, check_validity_only=False) -> InputData | None:
         """
@@ -105,6 +168,30 @@ class SimulationStep:
         input_data = InputData(identifier, self._name, params)
         return input_data
 
+    def generate_input_data_from_base(self, identifier: str, base: InputData, overrides: dict) -> InputData:
+        """
+        Generate InputData for this simulation step from a base InputData and the parameters overriding it. The base
+        is shared, not copied, and only the overriding parameters are validated, the base being already valid.
+
+        :param identifier: Unique identifier for the InputData instance.
+        :param base: The InputData of this step providing the parameters that are not overridden.
+        :param overrides: Parameters overriding the ones of the base.
+        :return: An InputData instance.
+        """
+        if base.step_name != self._name:
+            raise ValueError(f"Missmatch between SimulationStep and InputData, got SimulationStep '{self.name}'"
+                             f" and base InputData for '{base.step_name}'")
+        param_type_dict = {param["name"]: param["type"] for param in self.required_params}
+        invalid_params = [param_name for param_name in overrides if param_name not in param_type_dict]
+        invalid_type_params = [param_name for param_name, value in overrides.items()
+                               if param_name in param_type_dict and not isinstance(value, param_type_dict[param_name])]
+        if invalid_type_params:
+            raise ValueError(f"Invalid types for parameters in step {self._name}: {', '.join(invalid_type_params)}")
+        if invalid_params:
+            raise ValueError(f"Invalid parameters in step {self._name}: {', '.join(invalid_params)}")
+
+        return InputData(identifier, self._name, overrides, base=base)
+
     def is_inputdata_from_self(self, inputdata: InputData):
         """
         Check if an InpuData object belongs to the SimulationStep with the proper properties.
@@ -135,6 +222,7 @@ class SimulationStep:
         :param filename: The file path where the SimulationStep should be saved.
         :return: None
         """
+        import dill
         try:
             with open(filename, "wb") as f:
                 dill.dump(obj, f)
@@ -155,6 +243,7 @@ class SimulationStep:
         if not os.path.isfile(filename):
             raise FileNotFoundError(f"❌ File not found: {filename}")
 
+        import dill
         try:
             with open(filename, "rb") as f:
                 obj = dill.load(f)
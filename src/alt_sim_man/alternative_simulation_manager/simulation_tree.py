@@ -0,0 +1,157 @@
+"""
+Lazy traversal of the simulation tree of the alternatives.
+
+The tree is the nested list structure generated by AlternativeSimulationManager.group_alternatives_to_tree: a list
+of groups, each group being the list of the alternatives sharing a simulation step and its input data, followed by
+the list of the sub-groups for the next step. The functions below are generators walking this structure without
+copying the groups, with an extra memory proportional to the depth of the tree only (to the width of the tree for
+the breadth-first walk).
+"""
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .alternative import Alternative
+from .step_statistics import StepStatistics
+
+
+def iter_group_alternatives(group: list) -> Iterator[Alternative]:
+    """
+    Iterate over the alternatives of a group, without its sub-groups.
+    :param group: list, a group of the simulation tree.
+    """
+    return islice(group, len(group) - 1)
+
+
+def walk_tree_depth_first(simulation_tree: list) -> Iterator[Tuple[int, list]]:
+    """
+    Walk the simulation tree depth-first, each group being yielded before its sub-groups.
+    :param simulation_tree: list, the simulation tree.
+    :return: iterator of (step index, group)
+    """
+    iterator_stack = [iter(simulation_tree)]
+    while iterator_stack:
+        group = next(iterator_stack[-1], None)
+        if group is None:
+            iterator_stack.pop()
+            continue
+        yield len(iterator_stack) - 1, group
+        if group[-1]:
+            iterator_stack.append(iter(group[-1]))
+
+
+def walk_tree_breadth_first(simulation_tree: list) -> Iterator[Tuple[int, list]]:
+    """
+    Walk the simulation tree breadth-first, level by level.
+    :param simulation_tree: list, the simulation tree.
+    :return: iterator of (step index, group)
+    """
+    group_queue = deque((0, group) for group in simulation_tree)
+    while group_queue:
+        step_index, group = group_queue.popleft()
+        yield step_index, group
+        group_queue.extend((step_index + 1, sub_group) for sub_group in group[-1])
+
+
+def iter_tree_leaves(simulation_tree: list) -> Iterator[Tuple[int, list]]:
+    """
+    Iterate over the leaves of the simulation tree, the groups without sub-groups.
+    :param simulation_tree: list, the simulation tree.
+    :return: iterator of (step index, group)
+    """
+    return ((step_index, group) for step_index, group in walk_tree_depth_first(simulation_tree) if not group[-1])
+
+
+def iter_ready_nodes(simulation_tree: list, is_done: Callable[[int, list], bool]) -> Iterator[Tuple[int, list]]:
+    """
+    Iterate over the groups ready to be run: the groups that are not done and whose parent group is done.
+    The sub-trees of the groups that are not done are not walked.
+    :param simulation_tree: list, the simulation tree.
+    :param is_done: function taking the step index and the group, returning True if the group was run.
+    :return: iterator of (step index, group)
+    """
+    iterator_stack = [iter(simulation_tree)]
+    while iterator_stack:
+        group = next(iterator_stack[-1], None)
+        if group is None:
+            iterator_stack.pop()
+            continue
+        step_index = len(iterator_stack) - 1
+        if not is_done(step_index, group):
+            yield step_index, group
+        elif group[-1]:
+            iterator_stack.append(iter(group[-1]))
+
+
+def compute_tree_report(simulation_tree: list, num_workers: int = 1,
+                        step_statistics: Optional[StepStatistics] = None) -> Dict[str, Any]:
+    """
+    Compute the statistics of a simulation tree and predict the cost of its simulation, without running it, in a
+    single walk of the tree.
+    The wall time is predicted from the mean durations of the steps in the previous runs, as the maximum of the total
+    work shared by the workers and of the critical path. The critical path is the longest path of the dependency graph
+    of the nodes: as in the simulation executor, a node only waits for the closest ancestors running the steps it
+    depends on. The steps that never ran are counted as instantaneous and listed in the report.
+
+    :param simulation_tree: list, the simulation tree.
+    :param num_workers: int, number of workers running the simulation.
+    :param step_statistics: StepStatistics, the statistics of the previous runs of the steps.
+    :return: dict, the report.
+    """
+    step_statistics = step_statistics or StepStatistics()
+    num_nodes_per_level = []
+    num_naive_step_executions = 0
+    total_work = 0.
+    critical_path = 0.
+    disk_footprint = 0.
+    steps_without_statistics = set()
+    ancestor_path_list = []  # Step name and duration of the longest dependency path of the ancestors of the group
+    for step_index, group in walk_tree_depth_first(simulation_tree):
+        if step_index == len(num_nodes_per_level):
+            num_nodes_per_level.append(0)
+        num_nodes_per_level[step_index] += 1
+        num_naive_step_executions += len(group) - 1
+        step_name = group[0].step_list[step_index].name
+        duration = step_statistics.mean_duration(step_name)
+        if duration is None:
+            steps_without_statistics.add(step_name)
+            duration = 0.
+        result_size = step_statistics.mean_result_size(step_name)
+        disk_footprint += result_size or 0.
+        total_work += duration
+        del ancestor_path_list[step_index:]
+        path_duration = duration + max(_iter_dependency_path_durations(ancestor_path_list, group[0], step_index),
+                                       default=0.)
+        ancestor_path_list.append((step_name, path_duration))
+        critical_path = max(critical_path, path_duration)
+
+    num_nodes = sum(num_nodes_per_level)
+    return {
+        "num_alternatives": sum(len(group) - 1 for group in simulation_tree),
+        "num_nodes": num_nodes,
+        "num_nodes_per_level": num_nodes_per_level,
+        "num_naive_step_executions": num_naive_step_executions,
+        "num_saved_step_executions": num_naive_step_executions - num_nodes,
+        "num_workers": num_workers,
+        "predicted_total_work": total_work,
+        "predicted_critical_path": critical_path,
+        "predicted_wall_time": max(total_work / num_workers, critical_path),
+        "predicted_disk_footprint": disk_footprint,
+        "steps_without_statistics": sorted(steps_without_statistics),
+    }
+
+
+def _iter_dependency_path_durations(ancestor_path_list: List[Tuple[str, float]], alternative: Alternative,
+                                    step_index: int) -> Iterator[float]:
+    """
+    Iterate over the durations of the longest dependency paths of the closest ancestors running the steps a step
+    depends on.
+    """
+    sim_step = alternative.step_list[step_index]
+    for dependency in sim_step.dependencies:
+        path_duration = next((path_duration for step_name, path_duration in reversed(ancestor_path_list)
+                              if step_name == dependency), None)
+        if path_duration is None:
+            raise ValueError(f"Step '{sim_step.name}' of Alternative '{alternative.identifier}' depends on step "
+                             f"'{dependency}' that is not run before it")
+        yield path_duration
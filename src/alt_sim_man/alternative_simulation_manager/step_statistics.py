@@ -0,0 +1,85 @@
+"""
+Statistics of the previous runs of the simulation steps, used to predict the cost of a simulation.
+"""
+import json
+import os
+from typing import Dict, Optional
+
+
+class StepStatistics:
+    """
+    Durations and result sizes of the runs of each simulation step, by step name.
+    The statistics are saved in the simulation folder at the end of each run, and accumulated over the runs.
+    """
+    NAME_STATISTICS_FILE = "step_statistics.json"
+
+    def __init__(self):
+        self._statistics_dict: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def step_name_list(self):
+        return list(self._statistics_dict)
+
+    def add_run(self, step_name: str, duration: float, result_size: Optional[int] = None) -> None:
+        """
+        Add a run of a step.
+
+        :param step_name: str, the name of the step.
+        :param duration: float, the duration of the run in seconds.
+        :param result_size: int, the size of the saved result in bytes, None if unknown.
+        """
+        statistics = self._statistics_dict.setdefault(step_name, {"num_runs": 0, "total_duration": 0.,
+                                                                  "num_sized_runs": 0, "total_result_size": 0})
+        statistics["num_runs"] += 1
+        statistics["total_duration"] += duration
+        if result_size is not None:
+            statistics["num_sized_runs"] += 1
+            statistics["total_result_size"] += result_size
+
+    def merge(self, other: 'StepStatistics') -> None:
+        """
+        Add the runs of another StepStatistics object.
+        """
+        for step_name, other_statistics in other._statistics_dict.items():
+            statistics = self._statistics_dict.setdefault(step_name, dict.fromkeys(other_statistics, 0))
+            for key, value in other_statistics.items():
+                statistics[key] += value
+
+    def mean_duration(self, step_name: str) -> Optional[float]:
+        """
+        Mean duration of the runs of a step in seconds, None if the step never ran.
+        """
+        statistics = self._statistics_dict.get(step_name)
+        if statistics is None or statistics["num_runs"] == 0:
+            return None
+        return statistics["total_duration"] / statistics["num_runs"]
+
+    def mean_result_size(self, step_name: str) -> Optional[float]:
+        """
+        Mean size of the saved results of a step in bytes, None if unknown.
+        """
+        statistics = self._statistics_dict.get(step_name)
+        if statistics is None or statistics["num_sized_runs"] == 0:
+            return None
+        return statistics["total_result_size"] / statistics["num_sized_runs"]
+
+    def save(self, path_simulation_folder: str) -> None:
+        """
+        Save the statistics in the simulation folder.
+        """
+        path_statistics_file = os.path.join(path_simulation_folder, self.NAME_STATISTICS_FILE)
+        with open(path_statistics_file + ".tmp", "w") as f:
+            json.dump(self._statistics_dict, f, indent=4)
+        os.replace(path_statistics_file + ".tmp", path_statistics_file)
+
+    @classmethod
+    def load(cls, path_simulation_folder: str) -> 'StepStatistics':
+        """
+        Load the statistics saved in a simulation folder, empty statistics if there is none.
+        """
+        step_statistics = cls()
+        path_statistics_file = os.path.join(path_simulation_folder, cls.NAME_STATISTICS_FILE)
+        if os.path.isfile(path_statistics_file):
+            with open(path_statistics_file, "r") as f:
+                step_statistics._statistics_dict = json.load(f)
+        return step_statistics
@@ -0,0 +1,171 @@
+"""
+Functions run in the worker processes executing the simulation steps.
+
+The SimulationStep objects are kept in memory by each process once loaded, and their setup is run only once per
+process, so that the cost of loading a step and its libraries is paid once per worker instead of once per run.
+
+This module only imports what is needed to run a node, the serialisation backend is imported at the first task,
+so that short-lived workers start fast. It can also be run as a script to run a single node saved in a task file:
+    python -m alt_sim_man.alternative_simulation_manager.worker path_task_file path_result_file
+"""
+
+import hashlib
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Steps loaded and set up by this process, by step key
+_step_dict: Dict[str, Any] = {}
+_teardown_finalizer = None
+
+
+def make_step_key(sim_step) -> Tuple[str, bytes]:
+    """
+    Serialize a SimulationStep and make a key identifying its content.
+
+    :param sim_step: SimulationStep, the step to serialize.
+    :return: the key of the step and the step serialized with dill.
+    """
+    import dill
+    step_payload = dill.dumps(sim_step)
+    return f"{sim_step.name}:{hashlib.sha1(step_payload).hexdigest()}", step_payload
+
+
+def get_step(step_key: str, step_payload: bytes = None, sim_step=None):
+    """
+    Get a step of this process, loading it and running its setup the first time it is requested.
+
+    :param step_key: str, key of the step, as generated by make_step_key.
+    :param step_payload: bytes, the step serialized with dill, only loaded if the step is not known by the process.
+    :param sim_step: SimulationStep, the step itself, used instead of the payload when running in the main process.
+    :return: SimulationStep
+    """
+    global _teardown_finalizer
+    if step_key in _step_dict:
+        return _step_dict[step_key]
+    if sim_step is None:
+        import dill
+        sim_step = dill.loads(step_payload)
+    if sim_step.setup is not None:
+        sim_step.setup()
+    _step_dict[step_key] = sim_step
+    if _teardown_finalizer is None:
+        from multiprocessing.util import Finalize
+        # Finalizers are run when the worker processes of a pool exit, unlike atexit
+        _teardown_finalizer = Finalize(None, teardown_steps, exitpriority=10)
+    return sim_step
+
+
+def teardown_steps() -> None:
+    """
+    Run the teardown of all the steps set up by this process.
+    """
+    for sim_step in _step_dict.values():
+        if sim_step.teardown is not None:
+            sim_step.teardown()
+    _step_dict.clear()
+
+
+def _reset_after_fork() -> None:
+    """
+    Forget the steps of the parent process in a forked worker, their setup is run again by the worker and their
+    teardown is not run twice.
+    """
+    global _teardown_finalizer
+    _step_dict.clear()
+    _teardown_finalizer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run_batch(sim_step, input_data_list: list, inputs: Optional[list] = None) -> List[Tuple[Any, float, Optional[str]]]:
+    """
+    Run a simulation step for a batch of InputData sharing the same results of the dependencies.
+    With a batch function, the whole batch is run at once, its duration is split equally between the runs and an
+    error fails the whole batch. Otherwise, each run is timed separately and its error does not affect the others.
+
+    :param sim_step: SimulationStep, the step to run.
+    :param input_data_list: list of the InputData of each run.
+    :param inputs: list, the results of the steps the step depends on.
+    :return: the result, the duration in seconds and the error message, None if it succeeded, of each run.
+    """
+    if sim_step.batch_function is not None:
+        start_time = time.perf_counter()
+        result_list = sim_step.run_batch(input_data_list, inputs)
+        duration = (time.perf_counter() - start_time) / len(input_data_list)
+        return [(result, duration, None) for result in result_list]
+    output_list = []
+    for input_data in input_data_list:
+        start_time = time.perf_counter()
+        try:
+            result = sim_step.run(input_data, inputs)
+        except Exception as e:
+            output_list.append((None, time.perf_counter() - start_time, f"{type(e).__name__}: {e}"))
+        else:
+            output_list.append((result, time.perf_counter() - start_time, None))
+    return output_list
+
+
+def run_batch_task(step_key: str, step_payload: bytes, task_payload: bytes) -> bytes:
+    """
+    Run a simulation step for a batch of InputData in a worker process, so that the cost of dispatching a task is
+    paid once for the whole batch. This is the task submitted to the worker pool, a single node being run as a batch
+    of one.
+    The payloads and the output are serialized with dill, as the step functions are not necessarily picklable with
+    the standard pickle.
+
+    :param step_key: str, key of the step, as generated by make_step_key.
+    :param step_payload: bytes, the SimulationStep serialized with dill.
+    :param task_payload: bytes, the list of InputData and the results of the dependencies of the step.
+    :return: bytes, the output of run_batch serialized with dill.
+    """
+    import dill
+    sim_step = get_step(step_key, step_payload)
+    input_data_list, inputs = dill.loads(task_payload)
+    return dill.dumps(run_batch(sim_step, input_data_list, inputs))
+
+
+def run_task_file(path_task_file: str, path_result_file: str) -> None:
+    """
+    Run a single node saved in a task file and save its result, to run nodes in separate processes or machines.
+
+    :param path_task_file: str, path to the task file, the SimulationStep, its InputData and the results of its
+        dependencies serialized with dill.
+    :param path_result_file: str, path to the file where the result of the step and its duration are saved with dill.
+    """
+    import dill
+    with open(path_task_file, "rb") as f:
+        sim_step, input_data, inputs = dill.load(f)
+    if sim_step.setup is not None:
+        sim_step.setup()
+    start_time = time.perf_counter()
+    try:
+        result = sim_step.run(input_data, inputs)
+    finally:
+        if sim_step.teardown is not None:
+            sim_step.teardown()
+    duration = time.perf_counter() - start_time
+    path_tmp_file = path_result_file + ".tmp"
+    with open(path_tmp_file, "wb") as f:
+        dill.dump((result, duration), f)
+    os.replace(path_tmp_file, path_result_file)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the worker script.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m alt_sim_man.alternative_simulation_manager.worker path_task_file path_result_file",
+              file=sys.stderr)
+        return 2
+    run_task_file(argv[0], argv[1])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
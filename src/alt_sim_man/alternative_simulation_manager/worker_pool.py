@@ -0,0 +1,102 @@
+"""
+Pool of worker processes reused across the simulation runs.
+"""
+
+import atexit
+import os
+from typing import Callable, Optional
+
+
+class WorkerPool:
+    """
+    Pool of worker processes, started at the first submitted task and kept alive until it is shut down, so that the
+    workers and the steps they have set up are reused by the following runs.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None):
+        """
+        :param num_workers: int, number of worker processes, the number of CPUs if None.
+        """
+        self._num_workers = num_workers or os.cpu_count() or 1
+        self._process_pool = None
+
+    @property
+    def num_workers(self):
+        return self._num_workers
+
+    @property
+    def is_running(self):
+        return self._process_pool is not None
+
+    def submit(self, function: Callable, *args):
+        """
+        Submit a task to the pool, starting the workers if needed.
+
+        :param function: the function to run, it must be picklable.
+        :param args: the arguments of the function.
+        :return: Future of the result.
+        """
+        if self._process_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._process_pool = ProcessPoolExecutor(max_workers=self._num_workers)
+        return self._process_pool.submit(function, *args)
+
+    def terminate(self) -> None:
+        """
+        Kill the workers immediately, to stop a step that hangs or to recover from a crashed worker. The tasks
+        running are lost, the pool is started again at the next submitted task.
+        """
+        if self._process_pool is not None:
+            # ProcessPoolExecutor does not provide a public way to kill its workers
+            for process in list((self._process_pool._processes or {}).values()):
+                process.kill()
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
+
+    def shutdown(self) -> None:
+        """
+        Stop the workers, the teardown of the steps they have set up is run when they exit.
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+_shared_worker_pool: Optional[WorkerPool] = None
+
+
+def get_shared_worker_pool(num_workers: Optional[int] = None) -> WorkerPool:
+    """
+    Get the worker pool shared by all the simulation runs of the process. It is replaced by a new pool if a different
+    number of workers is requested.
+
+    :param num_workers: int, number of worker processes, the number of CPUs if None.
+    :return: WorkerPool
+    """
+    global _shared_worker_pool
+    num_workers = num_workers or os.cpu_count() or 1
+    if _shared_worker_pool is not None and _shared_worker_pool.num_workers != num_workers:
+        _shared_worker_pool.shutdown()
+        _shared_worker_pool = None
+    if _shared_worker_pool is None:
+        _shared_worker_pool = WorkerPool(num_workers)
+    return _shared_worker_pool
+
+
+def shutdown_shared_worker_pool() -> None:
+    """
+    Stop the shared worker pool.
+    """
+    global _shared_worker_pool
+    if _shared_worker_pool is not None:
+        _shared_worker_pool.shutdown()
+        _shared_worker_pool = None
+
+
+atexit.register(shutdown_shared_worker_pool)
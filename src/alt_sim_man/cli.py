@@ -0,0 +1,46 @@
+"""
+Command line interface of the package.
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from .alternative_simulation_manager.simulation_status import format_status, read_status
+
+
+def status_command(args: argparse.Namespace) -> int:
+    """
+    Display the status of a simulation, refreshed periodically with --watch until the simulation is no longer running.
+    """
+    while True:
+        try:
+            status = read_status(args.path_simulation_folder)
+        except FileNotFoundError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(format_status(status))
+        if args.watch is None or status["state"] != "running":
+            return 0
+        time.sleep(args.watch)
+        print()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the 'alt-sim-man' command.
+    """
+    parser = argparse.ArgumentParser(prog="alt-sim-man", description="Alternative simulation manager")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    status_parser = subparsers.add_parser("status", help="Display the status of a running simulation")
+    status_parser.add_argument("path_simulation_folder", help="Path to the simulation folder")
+    status_parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                               help="Refresh the status every SECONDS until the simulation ends")
+    status_parser.set_defaults(function=status_command)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
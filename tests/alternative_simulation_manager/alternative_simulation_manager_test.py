@@ -4,6 +4,8 @@
 
 import pytest
 
+from alt_sim_man.alternative_simulation_manager.alternative import Alternative
+from alt_sim_man.alternative_simulation_manager.simulation_step import SimulationStep
 from alt_sim_man.alternative_simulation_manager.alternative_simulation_manager import AlternativeSimulationManager
 
 from .simulation_step_test import step1, step2, step3
@@ -34,3 +36,48 @@ class TestAlternativeSimulationManager:
 
 
 
+    def test_iter_alternatives(self, alt1, alt2, alt3):
+        alt_sim_manager = AlternativeSimulationManager()
+        alt_sim_manager.add_alternatives([alt1, alt2, alt3])
+        assert list(alt_sim_manager.iter_alternative_ids()) == ["alt_1", "alt_2", "alt_3"]
+        assert list(alt_sim_manager.iter_alternatives()) == [alt1, alt2, alt3]
+
+    def test_group_equal_params(self):
+        sim_step = SimulationStep(name="Step", function=max, required_params=[{"name": "param", "type": dict}])
+        value_list = [{1: "a", 2: "b"}, {2: "b", 1: "a"}, {1: "a", 2: True}, {2: 1, 1: "a"}, {1: "a", 2: {3}}]
+        alternative_list = [Alternative(f"alt_{index}", step_input_data_tuple_list=[
+            (sim_step, sim_step.generate_input_data("in", {"param": value}))]) for index, value in enumerate(value_list)]
+        alt_sim_manager = AlternativeSimulationManager()
+        alt_sim_manager.add_alternatives(alternative_list)
+        tree = alt_sim_manager.group_alternatives_to_tree(alternative_id_list=alt_sim_manager.alternative_id_list)
+        # Equal parameters are grouped whatever the order of their keys or the type of their values
+        assert [group[:-1] for group in tree] == [alternative_list[:2], alternative_list[2:4], alternative_list[4:]]
+
+    def test_group_numpy_params(self):
+        np = pytest.importorskip("numpy")
+        sim_step = SimulationStep(name="Step", function=max, required_params=[{"name": "table", "type": np.ndarray}])
+        shared_input_data = sim_step.generate_input_data("in", {"table": np.arange(5.)})
+        input_data_list = [shared_input_data, shared_input_data,
+                           sim_step.generate_input_data("in", {"table": np.arange(5.)}),
+                           sim_step.generate_input_data("in", {"table": np.arange(6.)})]
+        alternative_list = [Alternative(f"alt_{index}", step_input_data_tuple_list=[(sim_step, input_data)])
+                            for index, input_data in enumerate(input_data_list)]
+        alt_sim_manager = AlternativeSimulationManager()
+        alt_sim_manager.add_alternatives(alternative_list)
+        tree = alt_sim_manager.group_alternatives_to_tree(alternative_id_list=alt_sim_manager.alternative_id_list)
+        # The arrays are compared by content
+        assert [group[:-1] for group in tree] == [alternative_list[:3], alternative_list[3:]]
+
+    def test_group_base_overrides(self, step1, step2):
+        base_1 = step1.generate_input_data("base_1", {"param1": 1, "param2": 3.5})
+        base_2 = step2.generate_input_data("base_2", {"param3": 1, "param4": 3.5})
+        alternative_list = [Alternative(f"alt_{value}", step_input_data_tuple_list=[
+            (step1, step1.generate_input_data_from_base("in_1", base_1, {"param2": 4.})),
+            (step2, step2.generate_input_data_from_base(f"in_2_{value}", base_2, {"param4": value}))])
+            for value in [1., 2., 3.]]
+        alt_sim_manager = AlternativeSimulationManager()
+        alt_sim_manager.add_alternatives(alternative_list)
+        tree = alt_sim_manager.group_alternatives_to_tree(alternative_id_list=alt_sim_manager.alternative_id_list)
+        # The first step is shared, the second one differs by its overriding parameter
+        assert len(tree) == 1 and len(tree[0]) == 4
+        assert [group[:-1] for group in tree[0][-1]] == [[alternative] for alternative in alternative_list]
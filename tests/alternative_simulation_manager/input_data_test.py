@@ -2,6 +2,8 @@
 
 """
 
+import os
+
 import pytest
 
 from alt_sim_man.alternative_simulation_manager.simulation_step import SimulationStep
@@ -58,8 +60,99 @@ class TestInputData:
         assert input_data_1 == input_data_2
         assert not input_data_1 == input_data_3
 
+    def test_save_load(self, tmp_path):
+        input_data = InputData("test", "Step_1", {"param1": 1, "param2": [3.5, 4.], "param3": (1, 2)})
+        InputData.save(input_data, str(tmp_path / "input_data"))
+        assert InputData.load(str(tmp_path / "input_data")) == input_data
+
+    def test_save_load_numpy(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        input_data = InputData("test", "Step_1", {"param1": 1, "table": np.arange(10.)})
+        InputData.save(input_data, str(tmp_path / "input_data"))
+        loaded_input_data = InputData.load(str(tmp_path / "input_data"))
+        assert loaded_input_data.params["param1"] == 1
+        assert isinstance(loaded_input_data.params["table"], np.memmap)
+        assert np.array_equal(loaded_input_data.params["table"], input_data.params["table"])
+        assert loaded_input_data == input_data
+
+    def test_eq_numpy(self):
+        np = pytest.importorskip("numpy")
+        base = InputData("base", "Step_1", {"param1": 1, "table": np.arange(5.)})
+        input_data_1 = InputData("in_test", "Step_1", {"table": np.arange(5.)}, base=base)
+        input_data_2 = InputData("in_test", "Step_1", {"table": np.arange(5.)}, base=base)
+        input_data_3 = InputData("in_test", "Step_1", {"table": np.arange(5)}, base=base)
+        plain_input_data = InputData("in_test", "Step_1", {"param1": 1, "table": np.arange(5.)})
+
+        assert input_data_1 == input_data_1
+        assert input_data_1 == input_data_2
+        assert input_data_1 == plain_input_data and plain_input_data == input_data_1
+        # Arrays with different types of data are different, as their fingerprints
+        assert not input_data_1 == input_data_3
+        assert not input_data_1 == InputData("in_test", "Step_1", {"table": [0., 1., 2., 3., 4.]}, base=base)
+
+    def test_base_overrides(self, step1):
+        base = step1.generate_input_data("base", {"param1": 1, "param2": 3.5})
+        input_data = step1.generate_input_data_from_base("in_test", base, {"param2": 4.})
+        assert dict(input_data.params) == {"param1": 1, "param2": 4.}
+        assert input_data.overrides == {"param2": 4.}
+        # The base is shared, not copied
+        assert input_data.base is base
+        with pytest.raises(ValueError):
+            step1.generate_input_data_from_base("in_test", base, {"param3": 4.})
+        with pytest.raises(ValueError):
+            step1.generate_input_data_from_base("in_test", base, {"param1": 4.})
 
+    def test_eq_base_overrides(self, step1):
+        base = step1.generate_input_data("base", {"param1": 1, "param2": 3.5})
+        input_data_1 = step1.generate_input_data_from_base("in_test", base, {"param2": 4.})
+        input_data_2 = step1.generate_input_data_from_base("in_test", base, {"param2": 4.})
+        input_data_3 = step1.generate_input_data_from_base("in_test", base, {"param1": 1})
+        input_data_4 = step1.generate_input_data_from_base("in_test", base, {"param2": 3.5})
+        plain_input_data = step1.generate_input_data("in_test", {"param1": 1, "param2": 4.})
 
+        assert input_data_1 == input_data_2
+        assert not input_data_1 == input_data_3
+        # Overriding a parameter with the value of the base is the same as not overriding it
+        assert input_data_3 == input_data_4
+        assert input_data_1 == plain_input_data
+
+    def test_fingerprint(self, step1):
+        base = step1.generate_input_data("base", {"param1": 1, "param2": 3.5})
+        input_data_1 = step1.generate_input_data_from_base("in_test", base, {"param2": 4.})
+        input_data_2 = step1.generate_input_data_from_base("in_test", base, {"param2": 5.})
+        plain_input_data = step1.generate_input_data("in_test", {"param1": 1, "param2": 4.})
+
+        assert input_data_1.fingerprint == plain_input_data.fingerprint
+        assert input_data_1.fingerprint != input_data_2.fingerprint
+        assert base.fingerprint != step1.generate_input_data("base_2", {"param1": 1, "param2": 3.5}).fingerprint
+
+    @pytest.mark.parametrize("value_1, value_2", [
+        ({1: "a", 2: "b"}, {2: "b", 1: "a"}),
+        ({"a": 1, "b": [1, 2]}, {"b": [1., 2.], "a": True}),
+        (True, 1),
+        (0., -0.),
+        (2, 2.),
+        ({1, 2}, {2, 1}),
+    ])
+    def test_fingerprint_eq(self, value_1, value_2):
+        # Equal InputData have the same fingerprint, whatever the representation of their values
+        input_data_1 = InputData("in_test", "Step_1", {"param1": value_1})
+        input_data_2 = InputData("in_test", "Step_1", {"param1": value_2})
 
-
-
+        assert input_data_1 == input_data_2
+        assert input_data_1.fingerprint == input_data_2.fingerprint
+
+    def test_save_load_base_overrides(self, tmp_path, step1):
+        base = step1.generate_input_data("base", {"param1": 1, "param2": 3.5})
+        input_data_list = [step1.generate_input_data_from_base(f"in_{value}", base, {"param2": value})
+                           for value in [4., 5.]]
+        for input_data in input_data_list:
+            InputData.save(input_data, str(tmp_path / input_data.identifier))
+        assert sorted(os.listdir(tmp_path)) == ["base_base", "in_4.0", "in_5.0"]
+
+        base_dict = {}
+        loaded_input_data_list = [InputData.load(str(tmp_path / input_data.identifier), base_dict=base_dict)
+                                  for input_data in input_data_list]
+        assert loaded_input_data_list == input_data_list
+        # The base is loaded once and shared
+        assert loaded_input_data_list[0].base is loaded_input_data_list[1].base
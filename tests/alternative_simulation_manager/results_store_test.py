@@ -0,0 +1,104 @@
+"""
+
+"""
+
+import shutil
+
+import dill
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from alt_sim_man.alternative_simulation_manager.results_store import ResultStore
+
+from .simulation_executor_test import step_base, step_scale, alternative_list, make_executor
+
+
+class TestResultStore:
+
+    def test_make_row(self, alternative_list):
+        row = ResultStore.make_row(alternative_list[0], {"value": 2, "array": [1, 2]})
+        assert row["alternative_id"] == alternative_list[0].identifier
+        assert row["Base.base"] == 1
+        assert row["Scale.factor"] == 2
+        assert row["Scale.input_data_id"] == "f2"
+        assert row["result.value"] == 2
+        assert isinstance(row["result.array"], bytes)
+
+    @pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+    def test_add_and_read(self, tmp_path, alternative_list, file_format):
+        result_store = ResultStore(str(tmp_path / "results"), batch_size=4, file_format=file_format)
+        for i, alternative in enumerate(alternative_list):
+            result_store.add_result(alternative, float(i))
+        assert len(result_store.part_file_list) == 1
+        assert result_store.num_buffered_rows == 2
+        result_store.close()
+        assert result_store.count_rows() == len(alternative_list)
+
+        table = result_store.read(columns=["alternative_id", "result"], filter=ds.field("Base.base") == 2)
+        assert table.num_rows == 3
+        assert pc.sum(table["result"]).as_py() == 3. + 4. + 5.
+
+    def test_invalid_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            ResultStore(str(tmp_path), file_format="csv")
+
+    def test_collect_from_executor(self, tmp_path, alternative_list):
+        result_store = ResultStore(str(tmp_path / "results"))
+        make_executor(alternative_list).run(str(tmp_path / "simulation"), result_store=result_store)
+        table = result_store.read()
+        assert table.num_rows == len(alternative_list)
+        result_dict = dict(zip(table["alternative_id"].to_pylist(), table["result"].to_pylist()))
+        assert result_dict["b2_f4"] == 8
+
+    def test_interrupted_run(self, tmp_path, alternative_list):
+        def interrupt(alternative, result):
+            if alternative.identifier == alternative_list[3].identifier:
+                raise KeyboardInterrupt
+            add_result(alternative, result)
+
+        result_store = ResultStore(str(tmp_path / "results"))
+        add_result = result_store.add_result
+        result_store.add_result = interrupt
+        with pytest.raises(KeyboardInterrupt):
+            make_executor(alternative_list).run(str(tmp_path / "simulation"), result_store=result_store)
+        # The buffered results are written
+        assert result_store.count_rows() == 3
+
+        # The alternatives completed but not collected, or whose results were lost, are collected when resumed
+        shutil.rmtree(str(tmp_path / "results"))
+        result_store = ResultStore(str(tmp_path / "results"))
+        result_store.add_result(alternative_list[0], 0)
+        result_store.flush()
+        make_executor(alternative_list).run(str(tmp_path / "simulation"), result_store=result_store)
+        assert sorted(result_store.read()["alternative_id"].to_pylist()) == \
+               sorted(alternative.identifier for alternative in alternative_list)
+
+    def test_overwrite_run(self, tmp_path, alternative_list):
+        result_store = ResultStore(str(tmp_path / "results"), batch_size=2)
+        for alternative in alternative_list:
+            result_store.add_result(alternative, -1)
+        make_executor(alternative_list).run(str(tmp_path / "simulation"), result_store=result_store)
+        assert result_store.read()["result"].to_pylist() == [-1] * len(alternative_list)
+
+        # The results of the previous runs are replaced
+        make_executor(alternative_list).run(str(tmp_path / "simulation"), overwrite=True, result_store=result_store)
+        table = result_store.read()
+        assert table.num_rows == len(alternative_list)
+        assert dict(zip(table["alternative_id"].to_pylist(), table["result"].to_pylist()))["b2_f4"] == 8
+
+    @pytest.mark.parametrize("batch_size", [1, 10])
+    @pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+    def test_mixed_types(self, tmp_path, alternative_list, batch_size, file_format):
+        # With a batch size of 1, the types conflict between the part files
+        result_store = ResultStore(str(tmp_path / "results"), batch_size=batch_size, file_format=file_format)
+        result_list = [1, "a", 2.5, None, 3, "b"]
+        for alternative, result in zip(alternative_list, result_list):
+            result_store.add_result(alternative, result)
+        result_store.close()
+        assert result_store.count_rows() == len(alternative_list)
+        table = result_store.read(columns=["result"])
+        assert [None if value is None else dill.loads(value) for value in table["result"].to_pylist()] == \
+               result_list
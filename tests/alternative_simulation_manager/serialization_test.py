@@ -0,0 +1,77 @@
+"""
+
+"""
+
+import sys
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager import serialization
+from alt_sim_man.alternative_simulation_manager.serialization import select_backend, save_object, load_object, \
+    find_object_file
+
+
+class TestSerialization:
+
+    def test_select_backend(self, monkeypatch):
+        monkeypatch.setattr(serialization, "_has_msgpack", lambda: False)
+        assert select_backend({"a": [1, 2.5, "b", None, True]}) == "json"
+        assert select_backend((1, 2)) == "dill"
+        assert select_backend({1: "a"}) == "dill"
+        assert select_backend(max) == "dill"
+
+    def test_has_msgpack_cached(self, monkeypatch):
+        # msgpack is not installed, its import is only attempted once
+        monkeypatch.setitem(sys.modules, "msgpack", None)
+        serialization._has_msgpack.cache_clear()
+        try:
+            assert select_backend({"a": 1}) == "json"
+            monkeypatch.delitem(sys.modules, "msgpack")
+            assert select_backend({"a": 1}) == "json"
+        finally:
+            serialization._has_msgpack.cache_clear()
+
+    def test_select_backend_numpy(self):
+        np = pytest.importorskip("numpy")
+        assert select_backend(np.zeros(3)) == "npy"
+        assert select_backend(np.array([max], dtype=object)) == "dill"
+
+    @pytest.mark.parametrize("backend", ["json", "dill"])
+    def test_save_load(self, tmp_path, backend):
+        obj = {"a": [1, 2.5, "b", None, True]}
+        path_file = save_object(obj, str(tmp_path / "obj"), backend=backend)
+        assert path_file.endswith(serialization.BACKEND_EXTENSIONS[backend])
+        assert find_object_file(str(tmp_path / "obj")) == path_file
+        assert load_object(path_file) == obj
+
+    def test_save_load_msgpack(self, tmp_path):
+        pytest.importorskip("msgpack")
+        obj = {"a": [1, 2.5, "b", None, True]}
+        path_file = save_object(obj, str(tmp_path / "obj"))
+        assert path_file.endswith(".msgpack")
+        assert load_object(path_file) == obj
+
+    def test_save_load_numpy(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        array = np.arange(12.).reshape(3, 4)
+        path_file = save_object(array, str(tmp_path / "array"))
+        loaded_array = load_object(path_file)
+        assert isinstance(loaded_array, np.memmap)
+        assert np.array_equal(loaded_array, array)
+        assert not isinstance(load_object(path_file, mmap=False), np.memmap)
+
+    def test_invalid_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            save_object(1, str(tmp_path / "obj"), backend="xml")
+        assert find_object_file(str(tmp_path / "obj")) is None
+
+    def test_large_int(self, tmp_path):
+        # Out of the range of msgpack
+        assert select_backend(3 ** 50) == "dill"
+        assert select_backend([2 ** 64 - 1, -2 ** 63]) != "dill"
+        assert load_object(save_object({"a": [3 ** 50]}, str(tmp_path / "obj"))) == {"a": [3 ** 50]}
+
+    def test_failed_save(self, tmp_path):
+        with pytest.raises(TypeError):
+            save_object({"a": max}, str(tmp_path / "obj"), backend="json")
+        assert list(tmp_path.iterdir()) == []
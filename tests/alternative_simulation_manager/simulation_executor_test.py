@@ -0,0 +1,410 @@
+"""
+
+"""
+
+import os
+import time
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.simulation_step import SimulationStep
+from alt_sim_man.alternative_simulation_manager.alternative import Alternative
+from alt_sim_man.alternative_simulation_manager.alternative_simulation_manager import AlternativeSimulationManager
+from alt_sim_man.alternative_simulation_manager.simulation_executor import SimulationExecutor
+from alt_sim_man.alternative_simulation_manager.results_store import ResultStore
+from alt_sim_man.alternative_simulation_manager.step_statistics import StepStatistics
+from alt_sim_man.alternative_simulation_manager.simulation_status import read_status
+from alt_sim_man.alternative_simulation_manager.worker_pool import WorkerPool
+
+
+def result_store_available():
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+
+def make_base(base):
+    return base
+
+
+def scale(base_result, factor):
+    return base_result * factor
+
+
+# Fixture for SimulationStep
+@pytest.fixture
+def step_base():
+    return SimulationStep(name="Base", function=make_base, required_params=[{"name": "base", "type": int}])
+
+
+@pytest.fixture
+def step_scale():
+    return SimulationStep(name="Scale", function=scale, required_params=[{"name": "factor", "type": int}],
+                          dependencies=["Base"])
+
+
+@pytest.fixture
+def alternative_list(step_base, step_scale):
+    base_1 = step_base.generate_input_data("b1", {"base": 1})
+    base_2 = step_base.generate_input_data("b2", {"base": 2})
+    alternative_list = []
+    for base in [base_1, base_2]:
+        for factor in [2, 3, 4]:
+            alternative_list.append(Alternative(
+                f"{base.identifier}_f{factor}",
+                step_input_data_tuple_list=[(step_base, base),
+                                            (step_scale, step_scale.generate_input_data(f"f{factor}",
+                                                                                        {"factor": factor}))]))
+    return alternative_list
+
+
+def add(view_factor_result, weather_result, offset):
+    return view_factor_result + weather_result + offset
+
+
+@pytest.fixture
+def independent_alternative_list():
+    step_view_factor = SimulationStep(name="View factor", function=make_base,
+                                      required_params=[{"name": "base", "type": int}])
+    step_weather = SimulationStep(name="Weather", function=make_base, required_params=[{"name": "base", "type": int}])
+    step_add = SimulationStep(name="Add", function=add, required_params=[{"name": "offset", "type": int}],
+                              dependencies=["View factor", "Weather"])
+    return [Alternative(f"alt_{offset}", step_input_data_tuple_list=[
+        (step_view_factor, step_view_factor.generate_input_data("vf", {"base": 1})),
+        (step_weather, step_weather.generate_input_data("w", {"base": 10})),
+        (step_add, step_add.generate_input_data(f"o{offset}", {"offset": offset}))]) for offset in [100, 200]]
+
+
+def faulty(mode, path_count_file=None):
+    if mode == "raise":
+        raise RuntimeError("Step failed")
+    if mode == "hang":
+        time.sleep(30)
+    if mode == "crash":
+        os._exit(1)
+    if mode == "interrupt":
+        raise KeyboardInterrupt
+    if mode == "flaky":
+        # Fail at the first call only
+        if not os.path.isfile(path_count_file):
+            open(path_count_file, "w").close()
+            raise RuntimeError("Step failed")
+    if mode == "flaky_2":
+        # Fail at the first two calls
+        with open(path_count_file, "a+") as f:
+            f.seek(0)
+            num_calls = len(f.read())
+            f.write("x")
+        if num_calls < 2:
+            raise RuntimeError("Step failed")
+    return mode
+
+
+def slow_base(base):
+    time.sleep(0.2)
+    return base
+
+
+def make_faulty_alternative_list(mode_list, path_count_file=None, **step_kwargs):
+    step_faulty = SimulationStep(name="Faulty", function=faulty,
+                                 required_params=[{"name": "mode", "type": str},
+                                                  {"name": "path_count_file", "type": str, "optional": True}],
+                                 **step_kwargs)
+    step_after = SimulationStep(name="After", function=make_base, required_params=[{"name": "base", "type": int}])
+    alternative_list = []
+    for mode in mode_list:
+        params = {"mode": mode} if path_count_file is None else {"mode": mode, "path_count_file": path_count_file}
+        alternative_list.append(Alternative(f"alt_{mode}", step_input_data_tuple_list=[
+            (step_faulty, step_faulty.generate_input_data(mode, params)),
+            (step_after, step_after.generate_input_data("a", {"base": 1}))]))
+    return alternative_list
+
+
+# Sizes of the batches run by scale_batch in this process
+batch_size_list = []
+
+
+def scale_batch(base_result, params_list):
+    batch_size_list.append(len(params_list))
+    return [base_result * params["factor"] for params in params_list]
+
+
+def make_sweep_alternative_list(mode_list):
+    """
+    Make alternatives sharing a base step, followed by a cheap leaf step with a batch function, or a faulty step.
+    """
+    step_base = SimulationStep(name="Base", function=make_base, required_params=[{"name": "base", "type": int}])
+    step_scale = SimulationStep(name="Scale", function=scale, required_params=[{"name": "factor", "type": int}],
+                                dependencies=["Base"], batch_function=scale_batch)
+    step_faulty = SimulationStep(name="Faulty", function=faulty, required_params=[{"name": "mode", "type": str}])
+    base = step_base.generate_input_data("b", {"base": 2})
+    alternative_list = []
+    for mode in mode_list:
+        if isinstance(mode, int):
+            step_input_data = (step_scale, step_scale.generate_input_data(f"f{mode}", {"factor": mode}))
+        else:
+            step_input_data = (step_faulty, step_faulty.generate_input_data(mode, {"mode": mode}))
+        alternative_list.append(Alternative(f"alt_{mode}", step_input_data_tuple_list=[(step_base, base),
+                                                                                       step_input_data]))
+    return alternative_list
+
+
+def make_payload(size):
+    return list(range(size))
+
+
+def payload_length(payload, factor):
+    return len(payload) * factor
+
+
+def make_wide_alternative_list():
+    """
+    Make alternatives whose shared steps have large results, needed by several children.
+    """
+    step_payload = SimulationStep(name="Payload", function=make_payload, required_params=[{"name": "size", "type": int}])
+    step_length = SimulationStep(name="Length", function=payload_length,
+                                 required_params=[{"name": "factor", "type": int}], dependencies=["Payload"])
+    return [Alternative(f"alt_{size}_{factor}", step_input_data_tuple_list=[
+        (step_payload, step_payload.generate_input_data(f"s{size}", {"size": size})),
+        (step_length, step_length.generate_input_data(f"f{factor}", {"factor": factor}))])
+        for size in [1000, 1001, 1002, 1003] for factor in [1, 2, 3]]
+
+
+def make_executor(alternative_list):
+    alt_sim_manager = AlternativeSimulationManager()
+    alt_sim_manager.add_alternatives(alternative_list)
+    tree = alt_sim_manager.group_alternatives_to_tree(alternative_id_list=alt_sim_manager.alternative_id_list)
+    return SimulationExecutor(alternative_list, tree)
+
+
+class TestSimulationExecutor:
+
+    def test_build_node_tree(self, alternative_list):
+        executor = make_executor(alternative_list)
+        assert len(executor.root_node_list) == 2
+        assert [len(node.children) for node in executor.root_node_list] == [3, 3]
+        child = executor.root_node_list[0].children[0]
+        assert child.dependency_node_list == [executor.root_node_list[0]]
+
+    def test_missing_dependency(self, step_scale):
+        alternative = Alternative("alt", step_input_data_tuple_list=[
+            (step_scale, step_scale.generate_input_data("f2", {"factor": 2}))])
+        with pytest.raises(ValueError):
+            make_executor([alternative])
+
+    @pytest.mark.parametrize("run_in_parallel", [False, True])
+    def test_run(self, tmp_path, alternative_list, run_in_parallel):
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=run_in_parallel, num_workers=2)
+        for alternative in alternative_list:
+            progress = alternative.read_progress_json_file(str(tmp_path))
+            assert progress["0"]["has_run"] and progress["1"]["has_run"]
+            base = alternative.input_data_list[0].params["base"]
+            factor = alternative.input_data_list[1].params["factor"]
+            assert alternative.load_step_result(str(tmp_path), 1) == base * factor
+        # The shared step is run only by the representative alternative
+        assert alternative_list[1].read_progress_json_file(str(tmp_path))["0"]["parent_alternative"] == \
+               alternative_list[0].identifier
+
+    def test_ready_nodes_from_dependencies(self, independent_alternative_list):
+        executor = make_executor(independent_alternative_list)
+        view_factor_node = executor.root_node_list[0]
+        weather_node = view_factor_node.children[0]
+        # Independent steps are ready together, even if they are in the same chain
+        assert list(executor.iter_ready_nodes()) == [view_factor_node, weather_node]
+        assert [node.dependency_node_list for node in weather_node.children] == \
+               [[view_factor_node, weather_node]] * 2
+        assert view_factor_node.dependent_node_list == weather_node.children
+
+    @pytest.mark.parametrize("run_in_parallel", [False, True])
+    def test_run_dependencies(self, tmp_path, independent_alternative_list, run_in_parallel):
+        result_store = ResultStore(str(tmp_path / "results")) if result_store_available() else None
+        executor = make_executor(independent_alternative_list)
+        executor.run(str(tmp_path / "simulation"), run_in_parallel=run_in_parallel, num_workers=2,
+                     result_store=result_store)
+        assert [alternative.load_step_result(str(tmp_path / "simulation"), 2)
+                for alternative in independent_alternative_list] == [111, 211]
+        assert all(node.is_chain_done and node.is_subtree_done and node.result is None
+                   for node in executor.iter_nodes_depth_first())
+        if result_store is not None:
+            assert sorted(result_store.read()["result"].to_pylist()) == [111, 211]
+
+    def test_step_statistics(self, tmp_path, alternative_list):
+        alt_sim_manager = AlternativeSimulationManager()
+        alt_sim_manager.add_alternatives(alternative_list)
+        report = alt_sim_manager.set_up(str(tmp_path))
+        assert report["num_nodes"] == 8
+        assert report["steps_without_statistics"] == ["Base", "Scale"]
+        alt_sim_manager.run()
+        step_statistics = StepStatistics.load(str(tmp_path))
+        assert step_statistics.mean_duration("Scale") is not None
+        assert step_statistics.mean_result_size("Scale") > 0
+        # The statistics of the run are used by the next set up
+        assert alt_sim_manager.set_up(str(tmp_path), num_workers=2)["steps_without_statistics"] == []
+
+    def test_resume(self, tmp_path, alternative_list):
+        make_executor(alternative_list).run(str(tmp_path))
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path))
+        assert all(node.has_run for node in executor.root_node_list)
+        # Results are loaded from the previous run only when needed
+        assert not any(node.is_result_loaded for node in executor.root_node_list)
+
+    def test_failure_isolation(self, tmp_path):
+        alternative_list = make_faulty_alternative_list(["ok", "raise"])
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path))
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_raise:0"]
+        # The sibling branch ran, the sub-tree of the failed node did not
+        assert alternative_list[0].read_progress_json_file(str(tmp_path))["1"]["has_run"]
+        progress = alternative_list[1].read_progress_json_file(str(tmp_path))
+        assert not progress["0"]["has_run"] and "Step failed" in progress["0"]["error"]
+        assert not progress["1"]["has_run"]
+        assert read_status(str(tmp_path))["counts"]["failed"] == 2
+
+    def test_retry(self, tmp_path):
+        alternative_list = make_faulty_alternative_list(["flaky"], path_count_file=str(tmp_path / "count"),
+                                                        max_retries=1, retry_backoff=0.01)
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path / "simulation"))
+        assert executor.failed_node_list == []
+        assert alternative_list[0].load_step_result(str(tmp_path / "simulation"), 0) == "flaky"
+
+    def test_resume_failed_subtree(self, tmp_path):
+        alternative_list = make_faulty_alternative_list(["ok", "flaky"], path_count_file=str(tmp_path / "count"))
+        make_executor(alternative_list).run(str(tmp_path / "simulation"))
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path / "simulation"))
+        assert executor.failed_node_list == []
+        assert read_status(str(tmp_path / "simulation"))["counts"] == \
+               {"pending": 0, "running": 0, "done": 2, "restored": 2, "failed": 0}
+
+    def test_timeout(self, tmp_path):
+        alternative_list = make_faulty_alternative_list(["ok", "hang"], timeout=0.5)
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=True, num_workers=2)
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_hang:0"]
+        assert "Timeout" in alternative_list[1].read_progress_json_file(str(tmp_path))["0"]["error"]
+        assert alternative_list[0].read_progress_json_file(str(tmp_path))["1"]["has_run"]
+
+    def test_worker_crash(self, tmp_path):
+        alternative_list = make_faulty_alternative_list(["ok", "crash", "ok_2"])
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=True, num_workers=2)
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_crash:0"]
+        for alternative in [alternative_list[0], alternative_list[2]]:
+            assert alternative.read_progress_json_file(str(tmp_path))["1"]["has_run"]
+
+    @pytest.mark.parametrize("run_in_parallel, max_retries", [(False, 1), (True, 1), (True, 0)])
+    def test_failed_ancestor_release(self, tmp_path, run_in_parallel, max_retries):
+        step_faulty = SimulationStep(name="Faulty", function=faulty, required_params=[{"name": "mode", "type": str}],
+                                     max_retries=max_retries, retry_backoff=0.5)
+        step_independent = SimulationStep(name="Independent", function=slow_base,
+                                          required_params=[{"name": "base", "type": int}])
+        step_leaf = SimulationStep(name="Leaf", function=make_base, required_params=[{"name": "base", "type": int}])
+        faulty_input_data = step_faulty.generate_input_data("raise", {"mode": "raise"})
+        independent_input_data = step_independent.generate_input_data("i", {"base": 1})
+        alternative_list = [Alternative(f"alt_{base}", step_input_data_tuple_list=[
+            (step_faulty, faulty_input_data), (step_independent, independent_input_data),
+            (step_leaf, step_leaf.generate_input_data(f"l{base}", {"base": base}))]) for base in range(4)]
+        # The steps that do not depend on the faulty one run while it waits for its retry, that fails, or are running
+        # when it fails without retry
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=run_in_parallel, num_workers=2, batch_duration=0)
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_0:0"]
+        assert executor.live_result_size == 0
+        assert not any(node.is_result_loaded for node in executor.iter_nodes_depth_first())
+
+    def test_worker_crash_many_nodes(self, tmp_path):
+        alternative_list = make_faulty_alternative_list(["ok", "crash", "ok_2", "ok_3", "ok_4"])
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=True, num_workers=3)
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_crash:0"]
+        for alternative in alternative_list[:1] + alternative_list[2:]:
+            assert alternative.read_progress_json_file(str(tmp_path))["1"]["has_run"]
+
+    @pytest.mark.parametrize("run_in_parallel", [False, True])
+    def test_batch_leaf_nodes(self, tmp_path, run_in_parallel):
+        alternative_list = make_sweep_alternative_list(list(range(50)))
+        batch_size_list.clear()
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=run_in_parallel, num_workers=2, batch_duration=1.)
+        assert [alternative.load_step_result(str(tmp_path), 1) for alternative in alternative_list] == \
+               [2 * factor for factor in range(50)]
+        if not run_in_parallel:
+            # The first node is run alone to measure the duration of the step, the others are batched
+            assert batch_size_list == [1, 49]
+
+    def test_batch_failure_isolation(self, tmp_path):
+        alternative_list = make_sweep_alternative_list(["ok", "raise", "ok_2"])
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), batch_duration=1.)
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_raise:1"]
+        for alternative in [alternative_list[0], alternative_list[2]]:
+            assert alternative.read_progress_json_file(str(tmp_path))["1"]["has_run"]
+
+    def test_no_batch(self, tmp_path):
+        alternative_list = make_sweep_alternative_list(list(range(5)))
+        batch_size_list.clear()
+        make_executor(alternative_list).run(str(tmp_path), batch_duration=0)
+        assert batch_size_list == [1] * 5
+
+    @pytest.mark.parametrize("run_in_parallel", [False, True])
+    def test_memory_budget(self, tmp_path, run_in_parallel):
+        alternative_list = make_wide_alternative_list()
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path), run_in_parallel=run_in_parallel, num_workers=2, memory_budget=1)
+        assert [alternative.load_step_result(str(tmp_path), 1) for alternative in alternative_list] == \
+               [size * factor for size in [1000, 1001, 1002, 1003] for factor in [1, 2, 3]]
+        # Only the result being used is kept in memory, the others are spilled and loaded again when needed
+        max_result_size = max(os.path.getsize(alternative.find_step_result_file(str(tmp_path), 0))
+                              for alternative in alternative_list[::3])
+        assert 0 < executor.peak_live_result_size <= max_result_size + 100
+        assert executor.live_result_size == 0
+
+    def test_broken_worker_pool(self, tmp_path, alternative_list):
+        with WorkerPool(num_workers=2) as worker_pool:
+            # A worker of the pool crashed before the run
+            with pytest.raises(Exception):
+                worker_pool.submit(faulty, "crash").result()
+            executor = make_executor(alternative_list)
+            executor.run(str(tmp_path), run_in_parallel=True, worker_pool=worker_pool)
+        assert executor.failed_node_list == []
+        assert all(node.has_run for node in executor.iter_nodes_depth_first())
+        assert read_status(str(tmp_path))["counts"]["done"] == 8
+
+
+    def test_setup_failure(self, tmp_path):
+        def failing_setup():
+            raise RuntimeError("No licence")
+
+        alternative_list = make_faulty_alternative_list(["ok"], setup=failing_setup)
+        executor = make_executor(alternative_list)
+        executor.run(str(tmp_path))
+        assert [node.identifier for node in executor.failed_node_list] == ["alt_ok:0"]
+        assert "No licence" in alternative_list[0].read_progress_json_file(str(tmp_path))["0"]["error"]
+
+    @pytest.mark.skipif(not result_store_available(), reason="pyarrow is not installed")
+    def test_resume_collect_restored_node(self, tmp_path):
+        step_faulty = SimulationStep(name="Faulty", function=faulty,
+                                     required_params=[{"name": "mode", "type": str},
+                                                      {"name": "path_count_file", "type": str}],
+                                     max_retries=1, retry_backoff=0.2)
+        step_independent = SimulationStep(name="Independent", function=make_base,
+                                          required_params=[{"name": "base", "type": int}])
+        alternative = Alternative("alt", step_input_data_tuple_list=[
+            (step_faulty, step_faulty.generate_input_data(
+                "f", {"mode": "flaky_2", "path_count_file": str(tmp_path / "count")})),
+            (step_independent, step_independent.generate_input_data("i", {"base": 1}))])
+        result_store = ResultStore(str(tmp_path / "results"))
+        # The independent step runs while the faulty one waits for its retry, that fails
+        executor = make_executor([alternative])
+        executor.run(str(tmp_path / "simulation"), result_store=result_store)
+        assert [node.identifier for node in executor.failed_node_list] == ["alt:0"]
+        # The faulty step succeeds when resumed, the independent one is restored
+        executor = make_executor([alternative])
+        executor.run(str(tmp_path / "simulation"), result_store=result_store)
+        assert executor.root_node_list[0].children[0].is_restored
+        assert result_store.read()["result"].to_pylist() == [1]
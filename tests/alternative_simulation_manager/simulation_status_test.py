@@ -0,0 +1,103 @@
+"""
+
+"""
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.results_store import ResultStore
+from alt_sim_man.alternative_simulation_manager.simulation_status import SimulationStatus, read_status, \
+    format_status
+
+from .simulation_executor_test import step_base, step_scale, alternative_list, make_executor, \
+    make_faulty_alternative_list
+
+
+class TestSimulationStatus:
+
+    def test_counts(self, tmp_path):
+        simulation_status = SimulationStatus(str(tmp_path), num_nodes=5, num_restored_nodes=1, update_interval=0.)
+        simulation_status.start_node("alt_1:0", "Step 1")
+        simulation_status.start_node("alt_2:0", "Step 1")
+        simulation_status.complete_node("alt_1:0")
+        status = read_status(str(tmp_path))
+        assert status["state"] == "running"
+        assert status["counts"] == {"pending": 2, "running": 1, "done": 1, "restored": 1, "failed": 0}
+        assert [node["node"] for node in status["slowest_running_nodes"]] == ["alt_2:0"]
+        assert status["eta"] is not None
+        assert "alt_2:0" in format_status(status)
+
+    def test_fail_node(self, tmp_path):
+        simulation_status = SimulationStatus(str(tmp_path), num_nodes=4, update_interval=0.)
+        simulation_status.start_node("alt_1:0", "Step 1")
+        simulation_status.fail_node("alt_1:0", num_skipped_nodes=2)
+        simulation_status.start_node("alt_2:0", "Step 1")
+        simulation_status.stop_node("alt_2:0")
+        assert read_status(str(tmp_path))["counts"] == {"pending": 1, "running": 0, "done": 0, "restored": 0,
+                                                        "failed": 3}
+
+    def test_update_interval(self, tmp_path):
+        simulation_status = SimulationStatus(str(tmp_path), num_nodes=2, update_interval=3600.)
+        simulation_status.start_node("alt_1:0", "Step 1")
+        simulation_status.complete_node("alt_1:0")
+        # Only the first event is written before the update interval
+        assert read_status(str(tmp_path))["counts"]["done"] == 0
+        simulation_status.finish()
+        assert read_status(str(tmp_path))["counts"]["done"] == 1
+
+    def test_invalid_final_state(self, tmp_path):
+        with pytest.raises(ValueError):
+            SimulationStatus(str(tmp_path), num_nodes=1).finish(state="running")
+
+    def test_no_status(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            read_status(str(tmp_path))
+
+    def test_status_from_executor(self, tmp_path, alternative_list):
+        make_executor(alternative_list).run(str(tmp_path))
+        status = read_status(str(tmp_path))
+        assert status["state"] == "completed"
+        assert status["counts"] == {"pending": 0, "running": 0, "done": 8, "restored": 0, "failed": 0}
+        # Resumed simulation
+        make_executor(alternative_list).run(str(tmp_path))
+        assert read_status(str(tmp_path))["counts"] == {"pending": 0, "running": 0, "done": 0, "restored": 8, "failed": 0}
+
+    def test_status_interrupted(self, tmp_path):
+        with pytest.raises(KeyboardInterrupt):
+            make_executor(make_faulty_alternative_list(["interrupt"])).run(str(tmp_path))
+        assert read_status(str(tmp_path))["state"] == "interrupted"
+
+    def test_status_failed(self, tmp_path, alternative_list, monkeypatch):
+        executor = make_executor(alternative_list)
+
+        def collect_batch(*args):
+            raise RuntimeError("Collection failed")
+
+        monkeypatch.setattr(executor, "_collect_batch", collect_batch)
+        with pytest.raises(RuntimeError):
+            executor.run(str(tmp_path))
+        assert read_status(str(tmp_path))["state"] == "failed"
+
+    def test_status_failed_result_store(self, tmp_path, alternative_list):
+        pytest.importorskip("pyarrow")
+        # The store cannot be written as its path is a file
+        path_store_dir = tmp_path / "results"
+        path_store_dir.write_text("")
+        with pytest.raises(OSError):
+            make_executor(alternative_list).run(str(tmp_path / "simulation"),
+                                                result_store=ResultStore(str(path_store_dir)))
+        assert read_status(str(tmp_path / "simulation"))["state"] == "failed"
+
+    def test_status_failed_flush(self, tmp_path, alternative_list):
+        result_store = ResultStore(str(tmp_path / "results"), batch_size=1)
+
+        num_flush_list = []
+
+        def flush():
+            num_flush_list.append(1)
+            raise RuntimeError(f"Flush {len(num_flush_list)} failed")
+
+        result_store.flush = flush
+        # The error of the run is raised, not the one of the store closed after it
+        with pytest.raises(RuntimeError, match="Flush 1 failed"):
+            make_executor(alternative_list).run(str(tmp_path / "simulation"), result_store=result_store)
+        assert read_status(str(tmp_path / "simulation"))["state"] == "failed"
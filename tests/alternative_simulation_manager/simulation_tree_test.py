@@ -0,0 +1,96 @@
+"""
+
+"""
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.alternative_simulation_manager import AlternativeSimulationManager
+from alt_sim_man.alternative_simulation_manager.simulation_tree import iter_group_alternatives, \
+    walk_tree_depth_first, walk_tree_breadth_first, iter_tree_leaves, iter_ready_nodes, compute_tree_report
+from alt_sim_man.alternative_simulation_manager.step_statistics import StepStatistics
+
+from .simulation_step_test import step1, step2, step3
+from .input_data_test import indata_1, indata_2, indata_3, indata_1_2, indata_2_2, indata_3_2
+from .alternative_test import alt1, alt2, alt3, alt4, alt5, alt6
+from .simulation_executor_test import independent_alternative_list
+
+
+@pytest.fixture
+def simulation_tree(alt1, alt2, alt3, alt4, alt5, alt6):
+    alt_sim_manager = AlternativeSimulationManager()
+    alt_sim_manager.add_alternatives([alt1, alt2, alt3, alt4, alt5, alt6])
+    return alt_sim_manager.group_alternatives_to_tree(alternative_id_list=alt_sim_manager.iter_alternative_ids())
+
+
+def to_id_list(group):
+    return [alternative.identifier for alternative in iter_group_alternatives(group)]
+
+
+class TestSimulationTree:
+
+    def test_walk_depth_first(self, simulation_tree):
+        node_list = [(step_index, to_id_list(group)) for step_index, group in walk_tree_depth_first(simulation_tree)]
+        assert node_list == [
+            (0, ["alt_1", "alt_2", "alt_3", "alt_5", "alt_6"]),
+            (1, ["alt_1", "alt_2", "alt_3", "alt_5"]),
+            (2, ["alt_1", "alt_5"]),
+            (3, ["alt_5"]),
+            (2, ["alt_2"]),
+            (1, ["alt_6"]),
+            (2, ["alt_6"]),
+            (0, ["alt_4"]),
+            (1, ["alt_4"]),
+        ]
+
+    def test_walk_breadth_first(self, simulation_tree):
+        step_index_list = [step_index for step_index, _ in walk_tree_breadth_first(simulation_tree)]
+        assert step_index_list == sorted(step_index_list)
+        assert len(step_index_list) == len(list(walk_tree_depth_first(simulation_tree)))
+
+    def test_iter_leaves(self, simulation_tree):
+        leaf_list = [to_id_list(group) for _, group in iter_tree_leaves(simulation_tree)]
+        assert leaf_list == [["alt_5"], ["alt_2"], ["alt_6"], ["alt_4"]]
+
+    def test_iter_ready_nodes(self, simulation_tree):
+        # Only the first level of the first root group has run
+        done_group = simulation_tree[0]
+        ready_list = [(step_index, to_id_list(group)) for step_index, group in
+                      iter_ready_nodes(simulation_tree, is_done=lambda step_index, group: group is done_group)]
+        assert ready_list == [(1, ["alt_1", "alt_2", "alt_3", "alt_5"]), (1, ["alt_6"]), (0, ["alt_4"])]
+
+    def test_compute_tree_report(self, simulation_tree):
+        report = compute_tree_report(simulation_tree)
+        assert report["num_alternatives"] == 6
+        assert report["num_nodes_per_level"] == [2, 3, 3, 1]
+        assert report["num_nodes"] == 9
+        assert report["num_naive_step_executions"] == 17
+        assert report["num_saved_step_executions"] == 8
+        assert report["predicted_wall_time"] == 0.
+        assert report["steps_without_statistics"] == ["Step 1", "Step 2", "Step 3"]
+
+    def test_compute_tree_report_with_statistics(self, simulation_tree):
+        step_statistics = StepStatistics()
+        for step_name, duration in [("Step 1", 1.), ("Step 2", 2.), ("Step 3", 4.)]:
+            step_statistics.add_run(step_name, duration, result_size=10)
+        report = compute_tree_report(simulation_tree, num_workers=2, step_statistics=step_statistics)
+        assert report["predicted_total_work"] == 24.
+        # The steps have no dependencies, the critical path is the longest step
+        assert report["predicted_critical_path"] == 4.
+        assert report["predicted_wall_time"] == 12.
+        assert report["predicted_disk_footprint"] == 90.
+        assert report["steps_without_statistics"] == []
+        report = compute_tree_report(simulation_tree, num_workers=10, step_statistics=step_statistics)
+        assert report["predicted_wall_time"] == 4.
+
+    def test_compute_tree_report_critical_path(self, independent_alternative_list):
+        alt_sim_manager = AlternativeSimulationManager()
+        alt_sim_manager.add_alternatives(independent_alternative_list)
+        simulation_tree = alt_sim_manager.group_alternatives_to_tree(
+            alternative_id_list=alt_sim_manager.iter_alternative_ids())
+        step_statistics = StepStatistics()
+        for step_name, duration in [("View factor", 3.), ("Weather", 5.), ("Add", 1.)]:
+            step_statistics.add_run(step_name, duration)
+        report = compute_tree_report(simulation_tree, num_workers=10, step_statistics=step_statistics)
+        # The weather does not depend on the view factor, they run at the same time before the additions
+        assert report["predicted_critical_path"] == 6.
+        assert report["predicted_wall_time"] == 6.
@@ -0,0 +1,32 @@
+"""
+
+"""
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.step_statistics import StepStatistics
+
+
+class TestStepStatistics:
+
+    def test_add_run(self):
+        step_statistics = StepStatistics()
+        assert step_statistics.mean_duration("Step 1") is None
+        step_statistics.add_run("Step 1", 1., result_size=100)
+        step_statistics.add_run("Step 1", 3.)
+        assert step_statistics.mean_duration("Step 1") == 2.
+        assert step_statistics.mean_result_size("Step 1") == 100
+
+    def test_save_load_merge(self, tmp_path):
+        assert StepStatistics.load(str(tmp_path)).step_name_list == []
+        step_statistics = StepStatistics()
+        step_statistics.add_run("Step 1", 1., result_size=100)
+        step_statistics.save(str(tmp_path))
+        loaded_step_statistics = StepStatistics.load(str(tmp_path))
+        other_step_statistics = StepStatistics()
+        other_step_statistics.add_run("Step 1", 3., result_size=300)
+        other_step_statistics.add_run("Step 2", 5.)
+        loaded_step_statistics.merge(other_step_statistics)
+        assert loaded_step_statistics.mean_duration("Step 1") == 2.
+        assert loaded_step_statistics.mean_result_size("Step 1") == 200
+        assert loaded_step_statistics.mean_duration("Step 2") == 5.
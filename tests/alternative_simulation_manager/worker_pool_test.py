@@ -0,0 +1,67 @@
+"""
+
+"""
+
+import os
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.simulation_step import SimulationStep
+from alt_sim_man.alternative_simulation_manager.alternative import Alternative
+from alt_sim_man.alternative_simulation_manager.worker_pool import WorkerPool, get_shared_worker_pool
+
+from .simulation_executor_test import make_executor
+
+
+def make_counted_setup_alternative_list(path_log_file, path_teardown_log_file=None):
+    def setup():
+        with open(path_log_file, "a") as f:
+            f.write(f"{os.getpid()}\n")
+
+    def teardown():
+        if path_teardown_log_file is not None:
+            with open(path_teardown_log_file, "a") as f:
+                f.write(f"{os.getpid()}\n")
+
+    sim_step = SimulationStep(name="Counted", function=lambda value: value,
+                              required_params=[{"name": "value", "type": int}], setup=setup, teardown=teardown)
+    return [Alternative(f"alt_{i}", step_input_data_tuple_list=[
+        (sim_step, sim_step.generate_input_data(f"v{i}", {"value": i}))]) for i in range(6)]
+
+
+def read_setup_pid_list(path_log_file):
+    with open(path_log_file) as f:
+        return f.read().split()
+
+
+class TestWorkerPool:
+
+    def test_setup_once_per_worker(self, tmp_path):
+        path_log_file = str(tmp_path / "setup.log")
+        path_teardown_log_file = str(tmp_path / "teardown.log")
+        alternative_list = make_counted_setup_alternative_list(path_log_file, path_teardown_log_file)
+        with WorkerPool(num_workers=2) as worker_pool:
+            make_executor(alternative_list).run(str(tmp_path / "run_1"), run_in_parallel=True,
+                                                worker_pool=worker_pool)
+            # The workers are reused by the following run
+            make_executor(alternative_list).run(str(tmp_path / "run_2"), run_in_parallel=True,
+                                                worker_pool=worker_pool)
+            assert worker_pool.is_running
+        pid_list = read_setup_pid_list(path_log_file)
+        assert 1 <= len(pid_list) <= 2
+        assert len(set(pid_list)) == len(pid_list)
+        assert not worker_pool.is_running
+        # The teardown is run when the workers exit
+        assert sorted(read_setup_pid_list(path_teardown_log_file)) == sorted(pid_list)
+
+    def test_setup_once_in_main_process(self, tmp_path):
+        path_log_file = str(tmp_path / "setup.log")
+        alternative_list = make_counted_setup_alternative_list(path_log_file)
+        make_executor(alternative_list).run(str(tmp_path / "run_1"))
+        make_executor(alternative_list).run(str(tmp_path / "run_2"))
+        assert read_setup_pid_list(path_log_file) == [str(os.getpid())]
+
+    def test_shared_worker_pool(self):
+        worker_pool = get_shared_worker_pool(num_workers=2)
+        assert get_shared_worker_pool(num_workers=2) is worker_pool
+        assert get_shared_worker_pool(num_workers=1) is not worker_pool
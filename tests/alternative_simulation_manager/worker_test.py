@@ -0,0 +1,89 @@
+"""
+
+"""
+
+import os
+import subprocess
+import sys
+
+import dill
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.simulation_step import SimulationStep
+from alt_sim_man.alternative_simulation_manager.worker import main, run_batch
+
+# Modules that should not be imported until they are needed
+HEAVY_MODULE_LIST = ["dill", "multiprocessing", "concurrent.futures.process", "pyarrow", "numpy"]
+# Maximum cumulative import time of a module of the package, in microseconds
+MAX_IMPORT_TIME = 500000
+
+
+def measure_import(module_name):
+    """
+    Import a module in a fresh interpreter, return its cumulative import time in microseconds and the heavy modules
+    it imported.
+    """
+    code = (f"import sys, {module_name}\n"
+            f"print(','.join(m for m in {HEAVY_MODULE_LIST!r} if m in sys.modules))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    completed_process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True,
+                                       text=True, env=env, check=True)
+    import_time = None
+    for line in completed_process.stderr.splitlines():
+        if line.rstrip().endswith(f"| {module_name}"):
+            import_time = int(line.split("|")[1])
+    return import_time, [module for module in completed_process.stdout.strip().split(",") if module]
+
+
+def double(value):
+    return 2 * value
+
+
+def inverse(value):
+    return 1 / value
+
+
+def double_batch(params_list):
+    return [2 * params["value"] for params in params_list]
+
+
+class TestWorker:
+
+    @pytest.mark.parametrize("module_name", ["alt_sim_man.alternative_simulation_manager.alternative_simulation_manager",
+                                             "alt_sim_man.alternative_simulation_manager.worker"])
+    def test_import_time(self, module_name):
+        import_time, heavy_module_list = measure_import(module_name)
+        assert heavy_module_list == []
+        assert import_time is not None and import_time < MAX_IMPORT_TIME
+
+    def test_run_task_file(self, tmp_path):
+        sim_step = SimulationStep("Double", double, [{"name": "value", "type": int}])
+        input_data = sim_step.generate_input_data("v3", {"value": 3})
+        path_task_file = str(tmp_path / "task.pkl")
+        path_result_file = str(tmp_path / "result.pkl")
+        with open(path_task_file, "wb") as f:
+            dill.dump((sim_step, input_data, []), f)
+
+        assert main([path_task_file, path_result_file]) == 0
+        with open(path_result_file, "rb") as f:
+            result, duration = dill.load(f)
+        assert result == 6
+        assert duration >= 0
+
+    def test_invalid_arguments(self):
+        assert main([]) == 2
+
+    def test_run_batch(self):
+        sim_step = SimulationStep("Inverse", inverse, [{"name": "value", "type": int}])
+        input_data_list = [sim_step.generate_input_data(f"v{value}", {"value": value}) for value in [2, 0, 4]]
+        output_list = run_batch(sim_step, input_data_list)
+        # The error of a run does not affect the others
+        assert [(result, error is None) for result, _, error in output_list] == \
+               [(0.5, True), (None, False), (0.25, True)]
+        assert "ZeroDivisionError" in output_list[1][2]
+
+    def test_run_batch_function(self):
+        sim_step = SimulationStep("Double", double, [{"name": "value", "type": int}], batch_function=double_batch)
+        input_data_list = [sim_step.generate_input_data(f"v{value}", {"value": value}) for value in range(3)]
+        assert [result for result, _, _ in run_batch(sim_step, input_data_list)] == [0, 2, 4]
+        assert sim_step.run_batch(input_data_list) == [0, 2, 4]
@@ -0,0 +1,26 @@
+"""
+
+"""
+
+import pytest
+
+from alt_sim_man.cli import main
+from alt_sim_man.alternative_simulation_manager.simulation_status import SimulationStatus
+
+
+class TestCli:
+
+    def test_status(self, tmp_path, capsys):
+        SimulationStatus(str(tmp_path), num_nodes=3).finish()
+        assert main(["status", str(tmp_path)]) == 0
+        assert "State: completed" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("state", ["completed", "interrupted", "failed"])
+    def test_status_watch(self, tmp_path, capsys, state):
+        # The watch stops once the simulation is no longer running
+        SimulationStatus(str(tmp_path), num_nodes=3).finish(state=state)
+        assert main(["status", str(tmp_path), "--watch", "0"]) == 0
+        assert capsys.readouterr().out.count("State: ") == 1
+
+    def test_status_not_found(self, tmp_path):
+        assert main(["status", str(tmp_path)]) == 1
@@ -0,0 +1,130 @@
+"""
+Options and fixtures of the performance tests, marked with 'performance'.
+
+The performance tests are skipped by default, run them with:
+    pytest --performance
+Each measured duration is compared to the baseline recorded in tests/performance/baselines.json, scaled by the
+speed of the machine measured on a calibration workload. A test fails if it is slower than its baseline by more
+than the threshold. The baselines are recorded again with:
+    pytest --performance --update-baselines
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+PATH_BASELINE_FILE = os.path.join(os.path.dirname(__file__), "performance", "baselines.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("performance")
+    group.addoption("--performance", action="store_true", default=False,
+                    help="Run the performance tests, marked with 'performance'")
+    group.addoption("--update-baselines", action="store_true", default=False,
+                    help="Record the durations of the performance tests as their new baselines")
+    group.addoption("--performance-threshold", type=float, default=1.,
+                    help="Relative slowdown compared to a baseline above which a performance test fails")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "performance: performance test compared to a recorded baseline")
+    config.performance_duration_dict = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--performance"):
+        return
+    skip_performance = pytest.mark.skip(reason="performance test, run with --performance")
+    for item in items:
+        if "performance" in item.keywords:
+            item.add_marker(skip_performance)
+
+
+def calibrate(repeat: int = 10) -> float:
+    """
+    Measure the duration of a fixed pure Python workload, to scale the baselines to the speed of the machine.
+    """
+    duration_list = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        value_dict = {}
+        for index in range(200000):
+            value_dict[str(index)] = index * 2
+        sum(value_dict.values())
+        duration_list.append(time.perf_counter() - start_time)
+    return min(duration_list)
+
+
+def load_baselines() -> dict:
+    if not os.path.isfile(PATH_BASELINE_FILE):
+        return {"calibration": None, "baselines": {}}
+    with open(PATH_BASELINE_FILE, "r") as f:
+        return json.load(f)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not config.getoption("--update-baselines") or not config.performance_duration_dict:
+        return
+    baseline_dict = load_baselines()
+    baseline_dict["calibration"] = calibrate()
+    baseline_dict["baselines"].update(config.performance_duration_dict)
+    baseline_dict["baselines"] = dict(sorted(baseline_dict["baselines"].items()))
+    with open(PATH_BASELINE_FILE, "w") as f:
+        json.dump(baseline_dict, f, indent=4)
+        f.write("\n")
+
+
+class PerformanceMeasure:
+    """
+    Measure the duration of a workload and compare it to its baseline.
+    """
+
+    def __init__(self, config):
+        self._config = config
+        self._baseline_dict = load_baselines()
+
+    def _get_speed_ratio(self) -> float:
+        """
+        Ratio between the speed of the machine when the baselines were recorded and now, measured once per session.
+        """
+        if getattr(self._config, "performance_speed_ratio", None) is None:
+            recorded_calibration = self._baseline_dict["calibration"]
+            self._config.performance_speed_ratio = calibrate() / recorded_calibration if recorded_calibration else 1.
+        return self._config.performance_speed_ratio
+
+    def __call__(self, name: str, function, repeat: int = 5, setup=None) -> float:
+        """
+        Measure the minimum duration of several runs of a workload, and check it against its baseline.
+
+        :param name: str, name of the baseline.
+        :param function: callable, the workload, called without arguments, or with the output of the setup.
+        :param repeat: int, number of runs, the fastest is kept to reduce the noise.
+        :param setup: callable, run before each run and not measured, its output is passed to the workload.
+        :return: float, the measured duration in seconds.
+        """
+        duration_list = []
+        for _ in range(repeat):
+            args = () if setup is None else (setup(),)
+            start_time = time.perf_counter()
+            function(*args)
+            duration_list.append(time.perf_counter() - start_time)
+        duration = min(duration_list)
+        if self._config.getoption("--update-baselines"):
+            self._config.performance_duration_dict[name] = duration
+            return duration
+        baseline = self._baseline_dict["baselines"].get(name)
+        if baseline is None:
+            pytest.skip(f"No baseline recorded for '{name}', record it with --update-baselines")
+        max_duration = baseline * self._get_speed_ratio() * (1 + self._config.getoption("--performance-threshold"))
+        assert duration <= max_duration, \
+            f"'{name}' took {duration:.4f} s, more than {max_duration:.4f} s allowed from its baseline of " \
+            f"{baseline:.4f} s"
+        return duration
+
+
+@pytest.fixture
+def measure_performance(request):
+    return PerformanceMeasure(request.config)
@@ -0,0 +1,119 @@
+"""
+Performance tests of the operations whose cost grows with the number of alternatives, compared to recorded baselines.
+Run with 'pytest --performance', see tests/conftest.py.
+"""
+
+import pytest
+
+from alt_sim_man.alternative_simulation_manager.simulation_step import SimulationStep
+from alt_sim_man.alternative_simulation_manager.alternative import Alternative
+from alt_sim_man.alternative_simulation_manager.alternative_simulation_manager import AlternativeSimulationManager
+
+pytestmark = pytest.mark.performance
+
+NUM_PARAMS = 20
+
+
+def make_base(base):
+    return base
+
+
+def select_base(base_result, **params):
+    return base_result
+
+
+def add(base_result, offset):
+    return base_result + offset
+
+
+def make_study(num_alternatives, use_base=False):
+    """
+    Make a synthetic study: a first step with 10 variants shared by the alternatives, a second step with many
+    parameters sweeping one of them, and a cheap last step.
+    """
+    step_base = SimulationStep(name="Base", function=make_base, required_params=[{"name": "base", "type": int}])
+    step_sweep = SimulationStep(name="Sweep", function=select_base,
+                                required_params=[{"name": f"param_{index}", "type": int}
+                                                 for index in range(NUM_PARAMS)],
+                                dependencies=["Base"])
+    step_add = SimulationStep(name="Add", function=add, required_params=[{"name": "offset", "type": int}],
+                              dependencies=["Base"])
+    base_input_data_list = [step_base.generate_input_data(f"b{index}", {"base": index}) for index in range(10)]
+    sweep_base = step_sweep.generate_input_data("sweep", {f"param_{index}": index for index in range(NUM_PARAMS)})
+    add_input_data = step_add.generate_input_data("a", {"offset": 1})
+    alternative_list = []
+    for index in range(num_alternatives):
+        value = index // 10
+        if use_base:
+            sweep_input_data = step_sweep.generate_input_data_from_base(f"s{value}", sweep_base, {"param_0": value})
+        else:
+            sweep_input_data = step_sweep.generate_input_data(
+                f"s{value}", dict(sweep_base.params, param_0=value))
+        alternative_list.append(Alternative(f"alt_{index}", step_input_data_tuple_list=[
+            (step_base, base_input_data_list[index % 10]), (step_sweep, sweep_input_data),
+            (step_add, add_input_data)]))
+    return alternative_list
+
+
+def make_manager(alternative_list):
+    alt_sim_manager = AlternativeSimulationManager()
+    alt_sim_manager.add_alternatives(alternative_list)
+    return alt_sim_manager
+
+
+class TestPerformance:
+
+    @pytest.mark.parametrize("use_base", [False, True])
+    def test_tree_grouping(self, measure_performance, use_base):
+        alt_sim_manager = make_manager(make_study(20000, use_base=use_base))
+        measure_performance(f"tree_grouping[{'base' if use_base else 'plain'}]",
+                            lambda: alt_sim_manager.group_alternatives_to_tree(alt_sim_manager.iter_alternative_ids()))
+
+    def test_input_data_validation(self, measure_performance):
+        sim_step = SimulationStep(name="Sweep", function=make_base,
+                                  required_params=[{"name": f"param_{index}", "type": int}
+                                                   for index in range(NUM_PARAMS)])
+        params_list = [{f"param_{index}": index * value for index in range(NUM_PARAMS)} for value in range(20000)]
+        measure_performance("input_data_validation",
+                            lambda: [sim_step.generate_input_data(f"in_{value}", params)
+                                     for value, params in enumerate(params_list)])
+
+    def test_input_data_validation_from_base(self, measure_performance):
+        sim_step = SimulationStep(name="Sweep", function=make_base,
+                                  required_params=[{"name": f"param_{index}", "type": int}
+                                                   for index in range(NUM_PARAMS)])
+        base = sim_step.generate_input_data("base", {f"param_{index}": index for index in range(NUM_PARAMS)})
+        measure_performance("input_data_validation_from_base",
+                            lambda: [sim_step.generate_input_data_from_base(f"in_{value}", base, {"param_0": value})
+                                     for value in range(20000)])
+
+    def test_progress_io(self, measure_performance, tmp_path):
+        alternative_list = make_study(200)
+
+        def init_progress():
+            for alternative in alternative_list:
+                alternative.make_alternative_dir(str(tmp_path), overwrite=True)
+                alternative.init_progress_json_file(str(tmp_path))
+
+        def update_progress(_):
+            for alternative in alternative_list:
+                for step_index in range(alternative.num_step):
+                    alternative.update_progress_json_file_after_run_step(str(tmp_path), step_index, 0.1,
+                                                                         parent_alternative=alternative.identifier)
+                alternative.read_progress_json_file(str(tmp_path))
+
+        measure_performance("progress_io", update_progress, setup=init_progress)
+
+    @pytest.mark.parametrize("run_in_parallel", [False, True])
+    def test_end_to_end(self, measure_performance, tmp_path, run_in_parallel):
+        alt_sim_manager = make_manager(make_study(200))
+        path_simulation_folder_list = []
+
+        def set_up():
+            path_simulation_folder = str(tmp_path / f"simulation_{len(path_simulation_folder_list)}")
+            path_simulation_folder_list.append(path_simulation_folder)
+            alt_sim_manager.set_up(path_simulation_folder)
+
+        measure_performance(f"end_to_end[{'parallel' if run_in_parallel else 'sequential'}]",
+                            lambda _: alt_sim_manager.run(run_in_parallel=run_in_parallel, num_workers=2),
+                            setup=set_up)